@@ -0,0 +1,35 @@
+"""
+benchmarks for Breeze's moderation pipeline, not shipped in the wheel
+
+run from the repo root (needs endstone and Breeze's dependencies installed):
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json   # compare the working tree against an earlier run
+    python -m benchmarks.simulate --players 50 --rate 40   # drive the real plugin with fake players, see simulate.py
+    python -m benchmarks.raids   # replay bot raids against the raid detection, see raids.py
+
+the corpus is generated from a seed so every run (and every version) sees the same messages,
+see corpus.py for the categories and how to replay a recorded corpus instead
+"""
+import platform, subprocess, sys, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# benchmark the working tree, not whatever version is installed
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+def run_metadata() -> dict[str, str | None]:
+    """what was benchmarked and where, for the top of every report"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,76 @@
+import argparse, hashlib, json, sys
+from pathlib import Path
+
+from . import run_metadata
+from . import corpus as corpus_module
+from .suite import BENCHMARKS, run
+
+def _corpus_hash(messages: list[corpus_module.Message]) -> str:
+    h = hashlib.sha256()
+    for message in messages:
+        h.update(f"{message.category}\0{message.text}\n".encode())
+    return h.hexdigest()
+
+def _compare(baseline: dict, current: dict) -> None:
+    """prints how every benchmark in both runs changed, negative latency changes are faster"""
+    print(f"{'benchmark':<32} {'p50 us':>12} {'p99 us':>12} {'ops/s':>12}", file=sys.stderr)
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+
+        def change(key: str) -> str:
+            return f"{(result[key] / old[key] - 1) * 100:+.1f}%" if old[key] else "n/a"
+
+        print(f"{name:<32} {change('p50_us'):>12} {change('p99_us'):>12} {change('ops_per_s'):>12}", file=sys.stderr)
+
+    if baseline.get("meta", {}).get("corpus_sha256") != current["meta"]["corpus_sha256"]:
+        print("note: the runs used different corpora, the numbers aren't directly comparable", file=sys.stderr)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="benchmark Breeze's moderation pipeline")
+    parser.add_argument("--size", type=int, default=1000, help="messages in the generated corpus (default 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default 0)")
+    parser.add_argument("--corpus", type=Path, help="replay a jsonl corpus instead of generating one")
+    parser.add_argument("--save-corpus", type=Path, help="write the corpus used to this jsonl file")
+    parser.add_argument("--repeat", type=int, default=3, help="measured passes over the corpus per benchmark (default 3)")
+    parser.add_argument("--cold", action="store_true", help="fresh filters (empty caches) for every pass")
+    parser.add_argument("--only", action="append", default=[], help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--output", type=Path, help="write the json results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="earlier results to compare against")
+    args = parser.parse_args(argv)
+
+    messages = corpus_module.load(args.corpus) if args.corpus else corpus_module.generate(args.size, args.seed)
+    if args.save_corpus:
+        corpus_module.save(messages, args.save_corpus)
+
+    benchmarks = [b for b in BENCHMARKS if not args.only or any(o in b.name for o in args.only)]
+    results = {}
+    for benchmark in benchmarks:
+        print(f"running {benchmark.name}...", file=sys.stderr)
+        results[benchmark.name] = run(benchmark, messages, repeat=args.repeat, cold=args.cold)
+
+    report = {
+        "meta": {
+            **run_metadata(),
+            "corpus": str(args.corpus) if args.corpus else f"generated (size={args.size}, seed={args.seed})",
+            "corpus_sha256": _corpus_hash(messages),
+            "messages": len(messages),
+            "repeat": args.repeat,
+            "cold": args.cold,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        _compare(json.loads(args.compare.read_text()), report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
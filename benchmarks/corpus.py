@@ -0,0 +1,106 @@
+"""
+synthetic chat corpus, the same seed always gives the same messages
+
+categories:
+- clean: normal chat, nothing to censor
+- profane: plain swearing mixed into normal chat
+- leetspeak: words with letters swapped for numbers/symbols (sh1t, @ss)
+- spaced: spaced-out evasions (f>u>c>k, s.h.i.t)
+- long: several sentences in one message
+- emoji: chat with emoji and non-ascii letters (which the tokenizer drops)
+"""
+import json, random
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+class Message(NamedTuple):
+    category: str
+    text: str
+
+CLEAN_WORDS = (
+    "hello", "hi", "hey", "gg", "lol", "anyone", "want", "to", "trade", "diamonds", "iron", "for", "my", "the", "a",
+    "where", "is", "spawn", "base", "village", "nether", "portal", "come", "here", "wait", "brb", "going", "mine",
+    "build", "house", "farm", "wheat", "sheep", "class", "pass", "shift", "what", "sheet", "duck", "fork", "shot",
+    "thanks", "nice", "cool", "server", "lag", "today", "tomorrow", "who", "has", "some", "food", "please", "ok",
+)
+PROFANE_WORDS = ("fuck", "shit", "bitch", "ass", "damn", "crap", "shlt", "fuk", "bith", "asshole", "bullshit")
+LEET = {"a": "4@", "e": "3", "i": "1!", "o": "0", "s": "5$", "t": "7", "l": "1", "u": "v"}
+SPACERS = (">", ".", "*", "-", "_", "!", "|")
+EMOJI = ("😂", "🔥", "💀", "👍", "😭", "❤️", "🎉", "👀")
+ACCENTED = ("café", "naïve", "über", "jalapeño", "señor", "fück")
+ENDINGS = ("", "", "", "!", "?", "...", "!!", " :)")
+
+CATEGORY_WEIGHTS = {
+    "clean": 40,
+    "profane": 15,
+    "leetspeak": 15,
+    "spaced": 10,
+    "long": 10,
+    "emoji": 10,
+}
+
+def _sentence(rng: random.Random, words: int, profane_rate: float = 0.0) -> str:
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(PROFANE_WORDS) if rng.random() < profane_rate else rng.choice(CLEAN_WORDS))
+    sentence = " ".join(out)
+    if rng.random() < 0.3:
+        sentence = sentence.capitalize()
+    return sentence + rng.choice(ENDINGS)
+
+def _leet(rng: random.Random, word: str) -> str:
+    return "".join(rng.choice(LEET[c]) if c in LEET and rng.random() < 0.6 else c for c in word)
+
+def _spaced(rng: random.Random, word: str) -> str:
+    spacer = rng.choice(SPACERS)
+    return spacer.join(word)
+
+def _message(rng: random.Random, category: str) -> str:
+    if category == "clean":
+        return _sentence(rng, rng.randint(1, 10))
+    if category == "profane":
+        return _sentence(rng, rng.randint(1, 10), profane_rate=0.25)
+    if category == "leetspeak":
+        words = _sentence(rng, rng.randint(1, 8), profane_rate=0.3).split(" ")
+        return " ".join(_leet(rng, w) if rng.random() < 0.5 else w for w in words)
+    if category == "spaced":
+        words = _sentence(rng, rng.randint(1, 6)).split(" ")
+        words.insert(rng.randint(0, len(words)), _spaced(rng, rng.choice(PROFANE_WORDS)))
+        return " ".join(words)
+    if category == "long":
+        return " ".join(_sentence(rng, rng.randint(8, 20), profane_rate=0.05) for _ in range(rng.randint(3, 8)))
+    if category == "emoji":
+        words = _sentence(rng, rng.randint(1, 8), profane_rate=0.15).split(" ")
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randint(0, len(words)), rng.choice(EMOJI + ACCENTED))
+        return " ".join(words)
+    raise ValueError(f"unknown category: {category}")
+
+def generate(size: int = 1000, seed: int = 0, weights: dict[str, int] | None = None) -> list[Message]:
+    """size messages, drawn from the categories by weight"""
+    rng = random.Random(seed)
+    weights = weights or CATEGORY_WEIGHTS
+    categories = list(weights)
+    picks = rng.choices(categories, weights=[weights[c] for c in categories], k=size)
+    return [Message(category, _message(rng, category)) for category in picks]
+
+def save(messages: Iterable[Message], path: str | Path) -> None:
+    """writes a corpus as jsonl, one {"category", "text"} per line"""
+    with open(path, "w", encoding="utf-8") as f:
+        for message in messages:
+            f.write(json.dumps(message._asdict(), ensure_ascii=False) + "\n")
+
+def load(path: str | Path) -> list[Message]:
+    """reads a jsonl corpus, lines can also be plain strings (recorded chat), those get the category "recorded" """
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                messages.append(Message("recorded", entry))
+            else:
+                messages.append(Message(entry.get("category", "recorded"), entry["text"]))
+    return messages
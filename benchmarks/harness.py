@@ -0,0 +1,188 @@
+"""
+stand-ins for the parts of endstone Breeze talks to, so the real plugin can run without a Bedrock server
+
+the scheduler only runs tasks when tick() is called, so whoever drives the harness decides how often the "server thread" gets to run them
+(20 ticks per second is a real server)
+"""
+import shutil, sys, threading, types, uuid
+from pathlib import Path
+from typing import Callable
+
+from endstone_breeze import breeze
+from endstone_breeze.breeze import Breeze
+
+class FakeLogger:
+    LEVELS = ("debug", "info", "warning", "error", "critical")
+
+    def __init__(self, level: str = "warning", stream=sys.stderr):
+        self.level = self.LEVELS.index(level)
+        self.stream = stream
+        self.counts = {name: 0 for name in self.LEVELS}
+        self._lock = threading.Lock()
+
+    def _log(self, level: str, message: str) -> None:
+        with self._lock:
+            self.counts[level] += 1
+            if self.LEVELS.index(level) >= self.level:
+                print(f"[{level.upper()}] {message}", file=self.stream)
+
+    def debug(self, message: str) -> None:
+        self._log("debug", message)
+
+    def info(self, message: str) -> None:
+        self._log("info", message)
+
+    def warning(self, message: str) -> None:
+        self._log("warning", message)
+
+    def error(self, message: str) -> None:
+        self._log("error", message)
+
+    def critical(self, message: str) -> None:
+        self._log("critical", message)
+
+class FakeTask:
+    _next_id = 1
+
+    def __init__(self, func: Callable[[], None], due: int, period: int):
+        self.task_id = FakeTask._next_id
+        FakeTask._next_id += 1
+        self.func = func
+        self.due = due
+        self.period = period
+        self.is_cancelled = False
+
+    def cancel(self) -> None:
+        self.is_cancelled = True
+
+class FakeScheduler:
+    """run_task like endstone's, delay and period are in ticks. thread-safe, chat workers hand their results back through it"""
+    def __init__(self):
+        self.current_tick = 0
+        self._tasks: list[FakeTask] = []
+        self._lock = threading.Lock()
+
+    def run_task(self, plugin, task: Callable[[], None], delay: int = 0, period: int = 0) -> FakeTask:
+        # a delay of 0 still waits for the next tick, like on a real server
+        fake_task = FakeTask(task, self.current_tick + max(1, delay), period)
+        with self._lock:
+            self._tasks.append(fake_task)
+        return fake_task
+
+    def cancel_task(self, task_id: int) -> None:
+        with self._lock:
+            for task in self._tasks:
+                if task.task_id == task_id:
+                    task.cancel()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for task in self._tasks if not task.is_cancelled and task.period == 0)
+
+    def tick(self) -> int:
+        """advances one tick and runs everything due, returns how many tasks ran"""
+        self.current_tick += 1
+        with self._lock:
+            due = [task for task in self._tasks if task.due <= self.current_tick and not task.is_cancelled]
+            self._tasks = [task for task in self._tasks if task.due > self.current_tick and not task.is_cancelled]
+
+        for task in due:
+            task.func()
+            if task.period > 0 and not task.is_cancelled:
+                task.due = self.current_tick + task.period
+                with self._lock:
+                    self._tasks.append(task)
+        return len(due)
+
+class FakeServer:
+    def __init__(self, logger: FakeLogger):
+        self.logger = logger
+        self.scheduler = FakeScheduler()
+        self.online_players: list[FakePlayer] = []
+        self.broadcasts = 0
+        self.on_broadcast: Callable[[str], None] | None = None
+
+    def broadcast_message(self, message: str) -> None:
+        self.broadcasts += 1
+        if self.on_broadcast is not None:
+            self.on_broadcast(message)
+
+    def get_player(self, unique_id: uuid.UUID) -> "FakePlayer | None":
+        """by uuid only, players count as online while they're in online_players"""
+        for player in self.online_players:
+            if player.unique_id == unique_id:
+                return player
+        return None
+
+class FakePlayer:
+    def __init__(self, name: str):
+        self.name = name
+        self.unique_id = uuid.uuid5(uuid.NAMESPACE_DNS, f"breeze-sim-{name}")
+        self.received: list[str] = []
+
+    def send_message(self, message: str) -> None:
+        self.received.append(message)
+
+class FakeChatEvent:
+    def __init__(self, player: FakePlayer, message: str):
+        self.player = player
+        self.message = message
+        self.format = "<{0}> {1}"
+        self.recipients: list[FakePlayer] = []
+        self.is_cancelled = False
+
+    def cancel(self) -> None:
+        self.is_cancelled = True
+
+class FakePlayerEvent:
+    """PlayerJoinEvent and PlayerQuitEvent, Breeze only looks at the player"""
+    def __init__(self, player: FakePlayer):
+        self.player = player
+
+def install_extensions_module() -> None:
+    """
+    handlers and extensions do `from extensions import PlayerDataManager, ...` (the example handler does), which only exists as
+    the installed __init__.pyi stub. registers an `extensions` module with the real classes under those names, so they load
+    """
+    if "extensions" in sys.modules:
+        return
+    module = types.ModuleType("extensions")
+    for name in ("PlayerData", "PlayerDataManager", "RateLimiter", "BreezeTextProcessing", "BreezeExtensionAPI"):
+        setattr(module, name, getattr(breeze, name))
+    module.__all__ = ["PlayerData", "PlayerDataManager", "RateLimiter", "BreezeTextProcessing", "BreezeExtensionAPI"] # type: ignore[attr-defined]
+    sys.modules["extensions"] = module
+
+def make_plugin(data_folder: str | Path, logger: FakeLogger | None = None) -> type[Breeze]:
+    """a Breeze subclass wired to a fake server, instantiate it and call on_enable() like endstone would"""
+    logger = logger or FakeLogger()
+    install_extensions_module()
+
+    class HarnessBreeze(Breeze):
+        # save_default_config looks up config.toml next to the plugin's module
+        __module__ = Breeze.__module__
+        server = FakeServer(logger)
+        is_enabled = True
+
+        def register_events(self, listener) -> None:
+            pass
+
+    HarnessBreeze.logger = logger
+    HarnessBreeze.data_folder = str(data_folder)
+    return HarnessBreeze
+
+def prepare_data_folder(
+    data_folder: str | Path,
+    extensions: list[Path] = [],
+    handler: Path | None = None,
+    config: Path | None = None,
+) -> Path:
+    """copies extensions (and a custom handler.py / config.toml) into a Breeze data folder"""
+    data_folder = Path(data_folder)
+    (data_folder / "extensions").mkdir(parents=True, exist_ok=True)
+    for extension in extensions:
+        shutil.copy(extension, data_folder / "extensions" / extension.name)
+    if handler is not None:
+        shutil.copy(handler, data_folder / "extensions" / "handler.py")
+    if config is not None:
+        shutil.copy(config, data_folder / "config.toml")
+    return data_folder
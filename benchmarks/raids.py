@@ -0,0 +1,148 @@
+"""
+replays bot raids against the raid detector (NearDuplicateIndex with the [raid_detection] defaults from config.toml):
+every bot posts its own copy of one ad with a few random typos, a second or so apart
+
+    python -m benchmarks.raids --raids 200 --edits 2
+
+reports how many raids reached min_players, how many of the bots' messages got flagged once they could be
+(the min_players-th bot on), and how much ordinary chat from the corpus got flagged by mistake.
+exits with 1 when fewer than --min-caught of the raids reach min_players, fewer than --min-flagged of the bots' messages
+are flagged, or any ordinary chat is flagged. with 3 or more typos each the copies are mostly under min_similarity
+alike with each other, so expect a lot less to be flagged there.
+python's string hashes are salted per process and the minhashes are built on them, so the numbers move a little
+from run to run, set PYTHONHASHSEED to repeat one exactly
+"""
+import argparse, json, random, string, sys, time, tomllib
+from importlib.resources import files
+from pathlib import Path
+
+from endstone_breeze.utils.matching_utils import NearDuplicateIndex
+
+from . import run_metadata
+from . import corpus as corpus_module
+
+AD = "join my server at coolcraft dot net for free ranks and kits!!"
+
+def raid_settings() -> dict:
+    """the [raid_detection] section of Breeze's default config.toml"""
+    return tomllib.loads(files("endstone_breeze").joinpath("config.toml").read_text())["raid_detection"]
+
+def _detector(settings: dict) -> NearDuplicateIndex:
+    # built the same way Breeze.on_enable builds it
+    return NearDuplicateIndex(
+        window=float(settings["window_seconds"]),
+        min_similarity=float(settings["min_similarity"]),
+        min_length=int(settings["min_length"]),
+    )
+
+def typo(rng: random.Random, text: str, edits: int) -> str:
+    """text with edits random letters swapped, added or dropped"""
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        kind = rng.randrange(3)
+        if kind == 0:
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif kind == 1:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif len(chars) > 1:
+            del chars[i]
+    return "".join(chars)
+
+def replay(args: argparse.Namespace) -> dict:
+    settings = raid_settings()
+    min_players = int(settings["min_players"])
+    rng = random.Random(args.seed)
+
+    reached = 0
+    flagged = 0 # bot messages flagged, over all raids
+    checks = 0
+    start = time.perf_counter()
+    for _ in range(args.raids):
+        detector = _detector(settings)
+        most = 0
+        for bot in range(args.bots):
+            found = detector.check(typo(rng, args.ad, args.edits), f"bot-{bot}", now=bot * args.interval)
+            checks += 1
+            if found is not None:
+                most = max(most, found.players)
+                flagged += found.players >= min_players
+        reached += most >= min_players
+    raid_took = time.perf_counter() - start
+
+    # ordinary chat on a busy server, nothing in it should look like a raid
+    detector = _detector(settings)
+    chat = corpus_module.generate(args.chat, args.seed)
+    false_flags = []
+    start = time.perf_counter()
+    for i, message in enumerate(chat):
+        found = detector.check(message.text, f"player-{i % args.chat_players}", now=i / args.chat_rate)
+        if found is not None and found.players >= min_players:
+            false_flags.append(message.text)
+    chat_took = time.perf_counter() - start
+
+    # bots before the min_players-th can't be flagged yet
+    flaggable = args.raids * max(args.bots - min_players + 1, 0)
+    return {
+        "meta": {
+            **run_metadata(),
+            "raid_detection": settings,
+            "raids": args.raids,
+            "bots": args.bots,
+            "edits": args.edits,
+            "interval_s": args.interval,
+            "ad": args.ad,
+            "chat": args.chat,
+            "chat_players": args.chat_players,
+            "chat_rate": args.chat_rate,
+            "seed": args.seed,
+        },
+        "results": {
+            "raids_reached": reached / args.raids if args.raids else 0.0,
+            "bots_flagged": flagged / flaggable if flaggable else 0.0,
+            "chat_flagged": len(false_flags),
+            "chat_flagged_examples": false_flags[:10],
+            "check_us": (raid_took + chat_took) / (checks + len(chat)) * 1e6 if checks + len(chat) else 0.0,
+        },
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.raids", description="replay bot raids against Breeze's raid detection")
+    parser.add_argument("--raids", type=int, default=200, help="raids to replay, each against a fresh detector (default 200)")
+    parser.add_argument("--bots", type=int, default=10, help="bots per raid (default 10)")
+    parser.add_argument("--edits", type=int, default=2, help="random typos in every bot's copy of the ad (default 2)")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between two bots' messages (default 0.5)")
+    parser.add_argument("--ad", default=AD, help="the message the bots post")
+    parser.add_argument("--chat", type=int, default=2000, help="ordinary chat messages to replay (default 2000)")
+    parser.add_argument("--chat-players", type=int, default=40, help="players sending the ordinary chat (default 40)")
+    parser.add_argument("--chat-rate", type=float, default=20, help="ordinary chat messages per second (default 20)")
+    parser.add_argument("--min-caught", type=float, default=0.95, help="share of raids that have to reach min_players (default 0.95)")
+    parser.add_argument("--min-flagged", type=float, default=0.85, help="share of the bots' messages that have to be flagged (default 0.85)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the json results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.raids < 1 or args.bots < 1 or args.chat_players < 1 or args.interval < 0 or args.chat_rate <= 0:
+        parser.error("--raids, --bots, --chat-players and --chat-rate have to be positive")
+
+    report = replay(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    results = report["results"]
+    if results["raids_reached"] < args.min_caught:
+        print(f"only {results['raids_reached']:.0%} of the raids reached min_players (wanted {args.min_caught:.0%})", file=sys.stderr)
+        return 1
+    if results["bots_flagged"] < args.min_flagged:
+        print(f"only {results['bots_flagged']:.0%} of the bots' messages were flagged (wanted {args.min_flagged:.0%})", file=sys.stderr)
+        return 1
+    if results["chat_flagged"]:
+        print(f"{results['chat_flagged']} ordinary chat messages were flagged as a raid", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+headless chat load simulator, drives the real Breeze plugin (on_enable, extensions, handler.py, on_chat_sent_by_player) with fake players
+
+    python -m benchmarks.simulate --players 50 --rate 40 --duration 30 --workers 2 --output sim.json
+
+messages are sent at --rate per second (spread over the players in turn) while the fake server ticks at --tps,
+chat workers hand their results back through the fake scheduler like they would on a real server.
+reports end-to-end latency (message sent -> broadcast/cancel), how long Breeze holds the server thread up,
+throughput, and how PlayerDataManager grows over the run
+"""
+import argparse, json, random, re, sys, tempfile, time, tracemalloc
+from collections import deque
+from importlib.resources import files
+from pathlib import Path
+
+from . import run_metadata
+from . import corpus as corpus_module
+from .harness import FakeLogger, FakeChatEvent, FakePlayer, FakePlayerEvent, make_plugin, prepare_data_folder
+from .suite import summarize
+
+def deep_size(obj, seen: set[int] | None = None) -> int:
+    """rough memory use of an object and everything it holds"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        if hasattr(obj, "__dict__"):
+            size += deep_size(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    return size
+
+def _write_config(data_folder: Path, workers: int | None, max_queue: int | None) -> None:
+    """Breeze's default config.toml with the moderation settings swapped in"""
+    config = files("endstone_breeze").joinpath("config.toml").read_text()
+    if workers is not None:
+        config = re.sub(r"(?m)^workers = \d+", f"workers = {workers}", config)
+    if max_queue is not None:
+        config = re.sub(r"(?m)^max_queue = \d+", f"max_queue = {max_queue}", config)
+    (data_folder / "config.toml").write_text(config)
+
+def simulate(args: argparse.Namespace) -> dict:
+    data_folder = Path(args.data_folder or tempfile.mkdtemp(prefix="breeze-sim-"))
+    prepare_data_folder(data_folder, extensions=args.extension, handler=args.handler, config=args.config)
+    if args.config is None:
+        _write_config(data_folder, args.workers, args.max_queue)
+
+    logger = FakeLogger(args.log_level)
+    pending: dict[str, deque[int]] = {} # player name -> send times of messages still being moderated
+    latencies: list[int] = []
+    outcomes = {"completed": 0, "cancelled": 0, "censored": 0, "rejected": 0}
+
+    class SimulatedBreeze(make_plugin(data_folder, logger)):
+        def _finish_chat(self, event, player_name, handled):
+            # a player's messages finish in the order they were sent, workers included
+            sent = pending[player_name].popleft()
+            super()._finish_chat(event, player_name, handled)
+            latencies.append(time.perf_counter_ns() - sent)
+            outcomes["completed"] += 1
+            outcomes["cancelled"] += bool(handled["fully_cancel_message"])
+            outcomes["censored"] += bool(handled["is_bad"])
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    plugin = SimulatedBreeze()
+    plugin.on_enable()
+    server = plugin.server
+    workers = int(plugin.setting("moderation", "workers", 0))
+
+    # load the filters now so the run measures a warmed-up server
+    from endstone_breeze import breeze
+    for profanity_filter in (breeze.pl, breeze.pe, breeze.pc):
+        profanity_filter.warm_up()
+
+    rng = random.Random(args.seed)
+    messages = corpus_module.load(args.corpus) if args.corpus else corpus_module.generate(max(1, args.size), args.seed)
+    joined = 0
+
+    def join() -> FakePlayer:
+        nonlocal joined
+        player = FakePlayer(f"player{joined}")
+        joined += 1
+        server.online_players.append(player)
+        pending[player.name] = deque()
+        plugin.on_player_join(FakePlayerEvent(player))
+        return player
+
+    def leave(player: FakePlayer) -> None:
+        server.online_players.remove(player)
+        plugin.on_player_quit(FakePlayerEvent(player))
+
+    for _ in range(args.players):
+        join()
+
+    def pdm_sample(elapsed: float) -> dict:
+        sample = {"t": round(elapsed, 3), "entries": len(plugin.pdm.player_data), "bytes": deep_size(plugin.pdm)}
+        if args.tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            sample["traced_bytes"] = current
+            sample["traced_peak_bytes"] = peak
+        return sample
+
+    chat_event_times: list[int] = []
+    tick_times: list[int] = []
+    pdm_samples = [pdm_sample(0.0)]
+    total = int(args.rate * args.duration)
+    send_interval = 1 / args.rate
+    tick_interval = 1 / args.tps
+    tick_budget_ns = int(tick_interval * 1e9)
+
+    def tick() -> None:
+        started = time.perf_counter_ns()
+        server.scheduler.tick()
+        tick_times.append(time.perf_counter_ns() - started)
+
+    started = time.perf_counter()
+    next_send = next_tick = next_sample = next_churn = started
+    next_sample += 1
+    next_churn += args.churn if args.churn > 0 else float("inf")
+    sent = 0
+    turn = 0
+
+    while sent < total:
+        now = time.perf_counter()
+
+        while sent < total and next_send <= now:
+            player = server.online_players[turn % len(server.online_players)]
+            turn += 1
+            message = messages[sent % len(messages)].text
+
+            rejected_before = plugin.chat_workers.rejected if plugin.chat_workers is not None else 0
+            pending[player.name].append(time.perf_counter_ns())
+            call_started = time.perf_counter_ns()
+            plugin.on_chat_sent_by_player(FakeChatEvent(player, message))
+            chat_event_times.append(time.perf_counter_ns() - call_started)
+            if plugin.chat_workers is not None and plugin.chat_workers.rejected > rejected_before:
+                pending[player.name].pop()
+                outcomes["rejected"] += 1
+
+            sent += 1
+            next_send += send_interval
+
+        if now >= next_tick:
+            tick()
+            next_tick += tick_interval
+
+        if now >= next_churn:
+            # someone leaves, someone new joins
+            leave(rng.choice(server.online_players))
+            join()
+            next_churn += args.churn
+
+        if now >= next_sample:
+            pdm_samples.append(pdm_sample(now - started))
+            next_sample += 1
+
+        time.sleep(max(0.0, min(next_send, next_tick) - time.perf_counter()))
+
+    sending_took = time.perf_counter() - started
+
+    # let the workers and the scheduler finish what's left
+    deadline = time.perf_counter() + args.drain_timeout
+    while any(pending.values()) and time.perf_counter() < deadline:
+        tick()
+        time.sleep(tick_interval)
+    elapsed = time.perf_counter() - started
+    pdm_samples.append(pdm_sample(elapsed))
+
+    listener_stats = plugin.bea.eventbus.stats()
+    plugin.on_disable()
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    return {
+        "meta": {
+            **run_metadata(),
+            "players": args.players,
+            "rate": args.rate,
+            "duration_s": args.duration,
+            "tps": args.tps,
+            "workers": workers,
+            "churn_s": args.churn,
+            "extensions": [str(p) for p in args.extension],
+            "handler": str(args.handler) if args.handler else None,
+            "handler_state": plugin.bmm.handler_state.name.lower(), # "custom" once handler.py actually loaded
+            "data_folder": str(data_folder),
+        },
+        "results": {
+            "sent": sent,
+            **outcomes,
+            "unfinished": sum(len(q) for q in pending.values()),
+            "broadcasts": server.broadcasts,
+            "send_rate": sent / sending_took if sending_took else 0.0,
+            "throughput": outcomes["completed"] / elapsed if elapsed else 0.0,
+            "latency": summarize(latencies),
+            "server_thread": {
+                "chat_event": summarize(chat_event_times),
+                "tick": summarize(tick_times),
+                "ticks_over_budget": sum(1 for t in tick_times if t > tick_budget_ns),
+            },
+            "player_data": {
+                "samples": pdm_samples,
+                "growth_bytes": pdm_samples[-1]["bytes"] - pdm_samples[0]["bytes"],
+            },
+            "listeners": listener_stats,
+            "log_counts": logger.counts,
+        },
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.simulate", description="drive the Breeze plugin with fake players")
+    parser.add_argument("--players", type=int, default=20, help="fake players online (default 20)")
+    parser.add_argument("--rate", type=float, default=20, help="messages per second over all players (default 20)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to send messages for (default 10)")
+    parser.add_argument("--tps", type=float, default=20, help="server ticks per second, scheduled tasks run on ticks (default 20)")
+    parser.add_argument("--workers", type=int, help="chat workers (the [moderation] workers setting), default is Breeze's default")
+    parser.add_argument("--max-queue", type=int, help="the [moderation] max_queue setting")
+    parser.add_argument("--config", type=Path, help="use this config.toml instead (--workers/--max-queue are ignored)")
+    parser.add_argument("--extension", type=Path, action="append", default=[], help="extension .py to load (repeatable)")
+    parser.add_argument("--handler", type=Path, help="custom handler to install as handler.py")
+    parser.add_argument("--data-folder", type=Path, help="Breeze data folder to use (default: a fresh temporary one)")
+    parser.add_argument("--churn", type=float, default=0, help="every this many seconds a player leaves and a new one joins (default never)")
+    parser.add_argument("--corpus", type=Path, help="replay a jsonl corpus instead of generating one")
+    parser.add_argument("--size", type=int, default=1000, help="messages in the generated corpus, cycled through (default 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drain-timeout", type=float, default=30, help="seconds to wait for queued messages after sending stops")
+    parser.add_argument("--tracemalloc", action="store_true", help="also track total python memory (slows everything down)")
+    parser.add_argument("--log-level", default="warning", choices=FakeLogger.LEVELS, help="Breeze log lines at this level and up are printed")
+    parser.add_argument("--output", type=Path, help="write the json results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.players < 1 or args.rate <= 0 or args.tps <= 0:
+        parser.error("--players, --rate and --tps have to be positive")
+
+    output = json.dumps(simulate(args), indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
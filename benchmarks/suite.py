@@ -0,0 +1,97 @@
+"""
+the benchmarks themselves
+
+every benchmark runs its function once per corpus message, first one unmeasured pass (to load the model and fill the caches,
+like a server that's been up for a bit), then `repeat` measured passes. with cold=True every pass gets fresh filters (empty caches) instead
+"""
+import time
+from typing import Callable, NamedTuple
+
+from .corpus import Message
+
+class Benchmark(NamedTuple):
+    name: str
+    group: str # "tokenizer", "filter" or "pipeline"
+    setup: Callable[[], Callable[[str], object]] # returns the function to time, called again per pass when cold
+
+def _percentile(sorted_samples: list[int], p: float) -> int:
+    if not sorted_samples:
+        return 0
+    index = min(len(sorted_samples) - 1, max(0, round(p / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+def summarize(samples: list[int]) -> dict[str, float]:
+    """samples are nanoseconds, the summary is in microseconds"""
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "calls": len(samples),
+        "total_s": total / 1e9,
+        "ops_per_s": len(samples) / (total / 1e9) if total else 0.0,
+        "mean_us": total / len(samples) / 1e3 if samples else 0.0,
+        "p50_us": _percentile(samples, 50) / 1e3,
+        "p99_us": _percentile(samples, 99) / 1e3,
+        "max_us": samples[-1] / 1e3 if samples else 0.0,
+    }
+
+def run(benchmark: Benchmark, corpus: list[Message], repeat: int = 3, cold: bool = False) -> dict:
+    perf_counter_ns = time.perf_counter_ns
+    func = benchmark.setup()
+    for message in corpus:
+        func(message.text)
+
+    samples: list[int] = []
+    by_category: dict[str, list[int]] = {}
+    for _ in range(repeat):
+        if cold:
+            func = benchmark.setup()
+        for message in corpus:
+            started = perf_counter_ns()
+            func(message.text)
+            elapsed = perf_counter_ns() - started
+            samples.append(elapsed)
+            by_category.setdefault(message.category, []).append(elapsed)
+
+    return {
+        "group": benchmark.group,
+        **summarize(samples),
+        "categories": {category: summarize(s) for category, s in sorted(by_category.items())},
+    }
+
+def _check_and_censor() -> Callable[[str], object]:
+    from endstone_breeze import breeze
+    from endstone_breeze.breeze import BreezeTextProcessing, BreezeLoadShedder
+
+    # the pipeline uses the module's filters, fresh caches for them so cold runs are cold too
+    breeze.pc.window_cache.clear()
+    breeze.pe.set_words(breeze.pe.words)
+    # no load shedding, every message goes through every layer
+    return BreezeTextProcessing(BreezeLoadShedder(enabled=False)).check_and_censor
+
+def _setup_filter(cls: str, method: str, **kwargs) -> Callable[[], Callable[[str], object]]:
+    def setup() -> Callable[[str], object]:
+        from endstone_breeze.utils import profanity_utils
+        profanity_filter = getattr(profanity_utils, cls)()
+        profanity_filter.warm_up()
+        func = getattr(profanity_filter, method)
+        return (lambda text: func(text, **kwargs)) if kwargs else func
+    return setup
+
+def _setup_tokenizer(name: str) -> Callable[[], Callable[[str], object]]:
+    def setup() -> Callable[[str], object]:
+        from endstone_breeze.utils import general_utils
+        return getattr(general_utils, name)
+    return setup
+
+BENCHMARKS = (
+    Benchmark("split_into_tokens", "tokenizer", _setup_tokenizer("split_into_tokens")),
+    Benchmark("scan_tokens", "tokenizer", _setup_tokenizer("scan_tokens")),
+    # same options check_and_censor uses for each layer
+    Benchmark("ProfanityCheck.is_profane", "filter", _setup_filter("ProfanityCheck", "is_profane")),
+    Benchmark("ProfanityCheck.censor", "filter", _setup_filter("ProfanityCheck", "censor", neighbors=2, window_size=1)),
+    Benchmark("ProfanityExtralist.is_profane", "filter", _setup_filter("ProfanityExtralist", "is_profane")),
+    Benchmark("ProfanityExtralist.censor", "filter", _setup_filter("ProfanityExtralist", "censor", neighbors=2)),
+    Benchmark("ProfanityLonglist.is_profane", "filter", _setup_filter("ProfanityLonglist", "is_profane")),
+    Benchmark("ProfanityLonglist.censor", "filter", _setup_filter("ProfanityLonglist", "censor", neighbors=1)),
+    Benchmark("check_and_censor", "pipeline", _check_and_censor),
+)
@@ -4,41 +4,86 @@
 
 from extensions import BreezeTextProcessing, PlayerDataManager, BreezeExtensionAPI #type: ignore
 
-import time
 from random import randint
 
 def handler(handler_input: "BreezeExtensionAPI.HandlerInput", player_data_manager: "PlayerDataManager", breeze_text_processing: "BreezeTextProcessing") -> "BreezeExtensionAPI.HandlerOutput":
     # player_data_manager is an instance of PlayerDataManager used by the server. It can be used to get and update player data.
-    # The server will automatically add/remove player data from it
+    # Player data is keyed by the player's uuid (str(player.unique_id)). The server will automatically add/remove player data from it,
+    # and drops players that have been idle for a while (see [player_data] in config.toml)
     
     # breeze_text_processing is an instance of BreezeTextProcessing used by the server. It can be used to check and censor messages (which removes & censors profane words).
-    sender_uuid = str(handler_input["player"].unique_id)
+
+    # If "workers" is set in Breeze's config.toml, this runs on a worker thread instead of the server thread.
+    # Then it must NOT call the server (player.send_message, server.broadcast_message...) directly, and handler_input has no "player".
+    # Use the values handler_input already has (player_uuid, player_name), handler_input["reply"] to message the sender,
+    # and handler_input["run_on_main"] for any other server call. Both run it on the server thread, and work with workers = 0 too
+    sender_uuid = handler_input["player_uuid"]
     finished_message = handler_input["message"]
 
-    local_player_data = player_data_manager.get_player_data(handler_input["player"].name)
+    local_player_data = player_data_manager.get_player_data(sender_uuid)
     is_bad = False # set to true if the message may violate your rules
     fully_cancel_message = (False, "") # first element is whether to fully cancel the message (i.e., not send it at all),
     # second element is the reason. it is unused internally but you can use it yourself. will get stored in the handleroutput
     should_check_message = True # weather to check the message or not. set to false to skip checking
     caught = [] # list of what methods to check the message was caught by. great for debugging if you're layering different filtering methods
+    offence = None # what to count against the player in their offence history, if anything
+    worthy_to_log = False # put the message in the moderation log (audit/moderation.jsonl) even if it isn't bad or cancelled
 
-    # spam check
-    if time.monotonic() - local_player_data["latest_time_a_message_was_sent"] < 0.5:
-        fully_cancel_message = (True, "messages sent too quickly")
+    # spam check, before the message is checked so floods don't cost anything
+    # allow_message uses the [rate_limit] settings from config.toml (a token bucket plus a sliding window).
+    # for a one-off limit of your own, player_data_manager.rate_limiter.allow(state) works with any state from rate_limiter.new_state()
+    if not player_data_manager.allow_message(sender_uuid):
+        fully_cancel_message = (True, "spam, gave displayed cancel")
         should_check_message = False
-        handler_input["player"].send_message("You're sending messages too fast!")
+        handler_input["reply"]("You're sending messages too fast!")
+
+    # raid check, the same message (give or take a few characters) from at least [raid_detection] min_players players at once.
+    # it's only flagged (logged) unless [raid_detection] cancel is on, and isn't counted against the player, innocent players can say the same thing too.
+    # breeze_text_processing.check_raid gives you the numbers (how many players, how many messages) to make your own call
+    if not fully_cancel_message[0] and breeze_text_processing.is_raid(handler_input["message"], sender_uuid):
+        fully_cancel_message = (breeze_text_processing.cancel_raids, "raid, near-duplicate of other players' messages")
+        worthy_to_log = True
+        if fully_cancel_message[0]:
+            handler_input["reply"]("Lots of players are sending that same message right now, so yours wasn't sent.")
+
+    # split word check, the end of a word the player started in their last message(s) ("fuc", then "k"), off unless [split_words] is enabled.
+    # the matcher state lives in local_player_data, so call this once per message, in order
+    if not fully_cancel_message[0] and breeze_text_processing.check_split(handler_input["message"], local_player_data):
+        fully_cancel_message = (True, "finishes a word split across messages")
+        is_bad = True
+        caught.append("Split")
 
     if fully_cancel_message[0]:
         should_check_message = False
 
     if should_check_message:
         finished_message, is_bad, caught = breeze_text_processing.check_and_censor(handler_input["message"])
+        # only the filters' verdict counts against the player, a split word on its own can be two innocent messages
+        if is_bad:
+            offence = "profanity"
+
+    if is_bad:
+        worthy_to_log = True
+
+    # offence history, kept across reconnects and restarts (see [offence_history] in config.toml). both calls only touch memory.
+    # player_data_manager.get_offence_history(sender_uuid) has .total, .counts (per kind) and .recent (the latest offences),
+    # e.g. fully cancel instead of censoring once history.total passes a limit
+    if offence is not None:
+        player_data_manager.record_offence(sender_uuid, offence, handler_input["message"])
+
+    # log about 1 in 3 cancelled messages on top of that
+    if fully_cancel_message[0] and randint(1, 3) == 1:
+        worthy_to_log = True
 
-    player_data_manager.update_player_data(handler_input["player"].name, handler_input["message"])
+    player_data_manager.update_player_data(sender_uuid, handler_input["message"])
 
     return {
         "is_bad": is_bad,
         "fully_cancel_message": fully_cancel_message[0],
         "finished_message": finished_message,
-        "original_message": handler_input["message"]
+        "original_message": handler_input["message"],
+        # optional, these only end up in the moderation log. bad and cancelled messages are always logged
+        "caught": caught,
+        "reason": fully_cancel_message[1],
+        "log": worthy_to_log,
     }
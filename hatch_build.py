@@ -0,0 +1,34 @@
+"""
+wheel build hook, precompiles the profanity word lists into endstone_breeze/resources/filters.pickle
+so a server doesn't decode and build them on every start. see utils/profanity_utils.py
+"""
+import importlib, shutil, sys, tempfile, types
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+class CustomBuildHook(BuildHookInterface):
+    def initialize(self, version, build_data):
+        if self.target_name != "wheel":
+            return
+
+        package_dir = Path(self.root) / "src" / "endstone_breeze"
+
+        # import only the utils, endstone_breeze/__init__.py needs endstone which isn't around at build time.
+        # the package still has to be called endstone_breeze so the pickled classes resolve when the plugin loads it
+        package = types.ModuleType("endstone_breeze")
+        package.__path__ = [str(package_dir)]
+        sys.modules.setdefault("endstone_breeze", package)
+        profanity_utils = importlib.import_module("endstone_breeze.utils.profanity_utils")
+
+        # built in a temporary folder, self.directory is the dist folder and anything left there ends up next to the wheel
+        self._artifact_dir = tempfile.mkdtemp(prefix="breeze-build-")
+        artifact = Path(self._artifact_dir) / profanity_utils.ARTIFACT_NAME
+        profanity_utils.build_artifact(artifact)
+        build_data["force_include"][str(artifact)] = f"endstone_breeze/resources/{profanity_utils.ARTIFACT_NAME}"
+
+    def finalize(self, version, build_data, artifact_path):
+        artifact_dir = getattr(self, "_artifact_dir", None)
+        if artifact_dir is not None:
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+            self._artifact_dir = None
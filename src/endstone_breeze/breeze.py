@@ -1,48 +1,928 @@
 from endstone import ColorFormat, scheduler
 from endstone.event import event_handler, PlayerJoinEvent, PlayerChatEvent, PlayerQuitEvent, EventPriority
 from endstone.plugin import Plugin
+from endstone.command import Command, CommandSender
 import endstone
 import importlib.resources as resources
 from importlib.resources import files
 
-from .utils.profanity_utils import ProfanityCheck, ProfanityLonglist, ProfanityExtralist
+from .utils.profanity_utils import ProfanityCheck, ProfanityLonglist, ProfanityExtralist, set_cache_dir
+# these are cheap to make, the model and word lists only load on first use (or in Breeze._warm_up)
 pc = ProfanityCheck()
 pl = ProfanityLonglist()
 pe = ProfanityExtralist()
-from .utils.general_utils import to_hash_mask, split_into_tokens
+from .utils.matching_utils import NearDuplicate, NearDuplicateIndex
+from .utils.general_utils import to_hash_mask, scan_tokens, drops_characters, apply_censor_mask, LatencyHistogram, LRUCache, RateLimiter, RateLimitState
 
 from enum import Enum
 from random import randint
-import os, time, asyncio, inspect, importlib.util, sys, threading
-from collections import defaultdict
+import os, time, json, asyncio, inspect, importlib.util, sys, threading, queue, functools, concurrent.futures, sqlite3, uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TypedDict, cast
-
-class PlayerData(TypedDict):
-    latest_time_a_message_was_sent: float
-    last_message: str
+from typing import Any, Callable, NamedTuple, NotRequired, TypedDict, cast
+
+class PlayerData:
+    """
+    what Breeze keeps per player, fixed slots so every record is the same small size
+
+    still works like the old dict (player_data["last_message"]) so existing handlers don't break
+    """
+    __slots__ = ("latest_time_a_message_was_sent", "last_message", "rate_limit", "last_seen", "split_node", "split_at", "split_version")
+
+    def __init__(self, rate_limit: RateLimitState, now: float):
+        self.latest_time_a_message_was_sent = now - 10
+        self.last_message = ""
+        self.rate_limit = rate_limit
+        self.last_seen = now
+        # where the longlist automaton stopped on the last message, for words split across messages (BreezeTextProcessing.check_split)
+        self.split_node = 0
+        self.split_at = now
+        self.split_version = 0 # longlist version split_node belongs to
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+class Offence(NamedTuple):
+    time: float # time.time()
+    kind: str # "profanity", "split", "raid", or whatever a custom handler records
+    message: str
+
+class OffenceHistory:
+    """a player's offences, all time counts plus the most recent few. what PlayerDataManager.get_offence_history hands out"""
+    __slots__ = ("total", "counts", "recent", "first_at", "last_at", "loaded")
+
+    def __init__(self, recent: int = 20):
+        self.total = 0
+        self.counts: dict[str, int] = {} # kind -> offences
+        self.recent: deque[Offence] = deque(maxlen=recent) # oldest first
+        self.first_at = 0.0
+        self.last_at = 0.0
+        # False until the store has read what earlier sessions left, only this session's offences are in it until then
+        self.loaded = False
+
+    def add(self, offence: Offence, n: int = 1) -> None:
+        self.total += n
+        self.counts[offence.kind] = self.counts.get(offence.kind, 0) + n
+        if not self.first_at or offence.time < self.first_at:
+            self.first_at = offence.time
+        self.last_at = max(self.last_at, offence.time)
+
+class BreezeOffenceStore:
+    """
+    offence history that outlives a session, in a local sqlite database (offences.db in the data folder)
+
+    online players' histories are kept in memory, so reading one or recording an offence never touches the disk. a player's
+    history is read in when they join (or first chat), and offences are written behind in batches, both on the store's own thread.
+    only the last `recent` offences per player are kept on disk, the counts are kept forever. if the thread falls
+    more than max_pending writes behind the newest are dropped (and counted)
+    """
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS offence_counts (uuid TEXT NOT NULL, kind TEXT NOT NULL, count INTEGER NOT NULL, first_at REAL NOT NULL, last_at REAL NOT NULL, PRIMARY KEY (uuid, kind)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS offences (uuid TEXT NOT NULL, time REAL NOT NULL, kind TEXT NOT NULL, message TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS offences_by_player ON offences (uuid, time)",
+    )
+    MAX_MESSAGE = 256 # characters of the message that get stored
+
+    def __init__(
+        self,
+        logger: endstone.Logger | None = None,
+        path: str | os.PathLike | None = None,
+        recent: int = 20,
+        flush_interval: float = 2.0,
+        max_batch: int = 512,
+        max_pending: int = 10000,
+    ):
+        self.logger = logger
+        self.path = path
+        self.recent = recent
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.written = 0
+        self.loads = 0
+        self.dropped = 0
+        self.errors = 0
+        self._histories: dict[str, OffenceHistory] = {} # the hot cache, uuid -> history
+        self._lock = threading.Lock()
+        # ("write", uuid, offence) and ("load", uuid, None), handled in order, None stops the thread
+        self._queue: queue.Queue[tuple[str, str, Offence | None] | None] = queue.Queue(maxsize=max_pending)
+        self._db: sqlite3.Connection | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        # made here so a bad path fails on enable, only the store's thread uses it after this
+        db = sqlite3.connect(self.path, check_same_thread=False) # type: ignore[arg-type]
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        with db:
+            for statement in self.SCHEMA:
+                db.execute(statement)
+        self._db = db
+        self._thread = threading.Thread(target=self._run, name="breeze-offences", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """writes whatever is still queued and closes the database"""
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+            self._thread = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def history(self, player_id: str) -> OffenceHistory:
+        """the player's history from memory. the first time round it's empty, and filled in once the store has read it"""
+        with self._lock:
+            history = self._histories.get(player_id)
+            if history is not None:
+                return history
+            history = self._histories[player_id] = OffenceHistory(self.recent)
+        if not self._submit(("load", player_id, None)):
+            # it won't ever be read in, don't leave it waiting
+            history.loaded = True
+        return history
+
+    def load(self, player_id: str) -> None:
+        """starts reading the player's history in, call it when they join so it's there by their first message"""
+        self.history(player_id)
+
+    def record(self, player_id: str, kind: str, message: str = "") -> Offence:
+        offence = Offence(time.time(), kind, message[:self.MAX_MESSAGE])
+        history = self.history(player_id)
+        with self._lock:
+            history.add(offence)
+            history.recent.append(offence)
+        self._submit(("write", player_id, offence))
+        return offence
+
+    def forget(self, player_id: str) -> None:
+        """drops the player from memory (they left), what's still queued for them is written anyway"""
+        with self._lock:
+            self._histories.pop(player_id, None)
+
+    def stats(self) -> dict[str, float]:
+        return {"players": len(self._histories), "pending": self._queue.qsize(), "written": self.written, "loads": self.loads, "dropped": self.dropped, "errors": self.errors}
+
+    def _submit(self, job: tuple[str, str, Offence | None]) -> bool:
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # writes wait up to flush_interval for company, a load (someone joining) goes straight away
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch and batch[-1] is not None:
+                waiting = batch[-1][0] == "write" and deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=waiting) if waiting and waiting > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            try:
+                self._handle(batch)
+            except Exception as e:
+                # _handle catches its own failures, this only keeps the thread alive if something else slips through
+                self._failed(e)
+
+    def _handle(self, batch: list[tuple[str, str, Offence | None]]) -> None:
+        # in order, a load has to see the writes queued before it and none after (those are already in memory).
+        # every write group and load gets its own try, one failing doesn't take the rest of the batch with it
+        writes: list[tuple[str, Offence]] = []
+        for kind, player_id, offence in batch:
+            if kind == "write":
+                writes.append((player_id, cast(Offence, offence)))
+                continue
+            self._try_write(writes)
+            writes = []
+            try:
+                self._load(player_id)
+            except Exception as e:
+                self._failed(e)
+                # what's on disk is missing from it, but this session's offences still count and nothing waits on it
+                with self._lock:
+                    history = self._histories.get(player_id)
+                    if history is not None:
+                        history.loaded = True
+        self._try_write(writes)
+
+    def _try_write(self, writes: list[tuple[str, Offence]]) -> None:
+        try:
+            self._write(writes)
+        except Exception as e:
+            # rolled back, so these never made it to disk
+            self.dropped += len(writes)
+            self._failed(e)
+
+    def _failed(self, error: Exception) -> None:
+        # only the first failure gets logged, the disk is likely to keep failing
+        self.errors += 1
+        if self.errors == 1 and self.logger is not None:
+            self.logger.warning(f"[BreezeOffenceStore] Couldn't use {self.path}: {error}")
+
+    def _write(self, writes: list[tuple[str, Offence]]) -> None:
+        if not writes:
+            return
+        db = cast(sqlite3.Connection, self._db)
+        counts: dict[tuple[str, str], list] = {}
+        for player_id, offence in writes:
+            count = counts.get((player_id, offence.kind))
+            if count is None:
+                counts[(player_id, offence.kind)] = [1, offence.time, offence.time]
+            else:
+                count[0] += 1
+                count[1] = min(count[1], offence.time)
+                count[2] = max(count[2], offence.time)
+        with db:
+            db.executemany("INSERT INTO offences VALUES (?, ?, ?, ?)", [(player_id, *offence) for player_id, offence in writes])
+            db.executemany(
+                "INSERT INTO offence_counts VALUES (?, ?, ?, ?, ?) ON CONFLICT (uuid, kind) DO UPDATE SET "
+                "count = count + excluded.count, first_at = min(first_at, excluded.first_at), last_at = max(last_at, excluded.last_at)",
+                [(player_id, kind, *count) for (player_id, kind), count in counts.items()],
+            )
+            # only the last few per player are kept
+            db.executemany(
+                "DELETE FROM offences WHERE uuid = ? AND rowid NOT IN (SELECT rowid FROM offences WHERE uuid = ? ORDER BY time DESC LIMIT ?)",
+                [(player_id, player_id, self.recent) for player_id in {player_id for player_id, _ in writes}],
+            )
+        self.written += len(writes)
+
+    def _load(self, player_id: str) -> None:
+        db = cast(sqlite3.Connection, self._db)
+        counts = db.execute("SELECT kind, count, first_at, last_at FROM offence_counts WHERE uuid = ?", (player_id,)).fetchall()
+        recent = db.execute("SELECT time, kind, message FROM offences WHERE uuid = ? ORDER BY time DESC LIMIT ?", (player_id, self.recent)).fetchall()
+        self.loads += 1
+        with self._lock:
+            history = self._histories.get(player_id)
+            if history is None or history.loaded:
+                return
+            # what's in memory so far happened after everything on disk
+            for kind, count, first_at, last_at in counts:
+                history.add(Offence(first_at, kind, ""), count)
+                history.last_at = max(history.last_at, last_at)
+            session = list(history.recent)
+            history.recent.clear()
+            history.recent.extend(Offence(*row) for row in reversed(recent))
+            history.recent.extend(session)
+            history.loaded = True
+
+def _looks_like_uuid(key: str) -> bool:
+    """str(player.unique_id) shape, 8-4-4-4-12 hex digits. cheap, it's only checked for new records"""
+    return len(key) == 36 and key[8] == key[13] == key[18] == key[23] == "-"
 
 class PlayerDataManager:
-    player_data: defaultdict[str, PlayerData]
+    """
+    per-player data keyed by the player's uuid (str(player.unique_id)), names can change
 
-    def __init__(self):
-        self.player_data = defaultdict(lambda: cast(PlayerData, {
-            "latest_time_a_message_was_sent": time.monotonic() - 10,
-            "last_message": ""
-        }))
-    
-    def update_player_data(self, name, message) -> None:
-        self.player_data[name]["latest_time_a_message_was_sent"] = time.monotonic()
-        self.player_data[name]["last_message"] = message
+    thread-safe, chat workers and the server thread can both use it. records that haven't been touched for
+    idle_timeout seconds are dropped by evict_idle() (Breeze runs it on the scheduler), so players who never
+    properly quit (crashes, kicks) don't pile up. past max_players the least recently used one goes straight away
+
+    offence histories (get_offence_history, record_offence) come from the offence store and survive reconnects and restarts,
+    without one they're only kept in memory until the player leaves
+    """
+    player_data: OrderedDict[str, PlayerData] # least recently used first
+    rate_limiter: RateLimiter
+    offences: BreezeOffenceStore | None
+
+    def __init__(self, rate_limiter: RateLimiter | None = None, idle_timeout: float = 600.0, max_players: int = 10000, logger: endstone.Logger | None = None):
+        self.logger = logger
+        self._warned_key = False
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.idle_timeout = idle_timeout
+        self.max_players = max_players # 0 doesn't cap it
+        self.player_data = OrderedDict()
+        self.offences = None
+        self._histories: dict[str, OffenceHistory] = {} # only used without an offence store
+        self._lock = threading.Lock()
+
+    def get_player_data(self, player_id: str) -> PlayerData:
+        """the player's record, made if they don't have one yet"""
+        now = time.monotonic()
+        with self._lock:
+            data = self.player_data.get(player_id)
+            if data is None:
+                if not self._warned_key and not _looks_like_uuid(player_id):
+                    self._warn_key(player_id)
+                data = self.player_data[player_id] = PlayerData(self.rate_limiter.new_state(now), now)
+                if self.max_players and len(self.player_data) > self.max_players:
+                    evicted_id, _ = self.player_data.popitem(last=False)
+                    self._histories.pop(evicted_id, None)
+                    if self.offences is not None:
+                        self.offences.forget(evicted_id)
+            else:
+                self.player_data.move_to_end(player_id)
+            data.last_seen = now
+            return data
+
+    def _warn_key(self, player_id: str) -> None:
+        # once, handlers written before player data was keyed by uuid still pass player.name
+        self._warned_key = True
+        if self.logger is not None:
+            self.logger.warning(
+                f"[PlayerDataManager] Player data looked up by {player_id!r}, which isn't a uuid. Keying player data by name is deprecated, "
+                "use str(player.unique_id): records keyed by name aren't dropped when the player leaves, only once they've been idle for a while"
+            )
+
+    def update_player_data(self, player_id: str, message: str) -> None:
+        data = self.get_player_data(player_id)
+        data.latest_time_a_message_was_sent = data.last_seen
+        data.last_message = message
+
+    def remove_player_data(self, player_id: str) -> None:
+        with self._lock:
+            self.player_data.pop(player_id, None)
+            self._histories.pop(player_id, None)
+        if self.offences is not None:
+            self.offences.forget(player_id)
+
+    def reset_player_data(self, player_id: str) -> PlayerData:
+        """a fresh record for the player, like they never chatted. their offence history stays, and gets read in if it isn't yet"""
+        now = time.monotonic()
+        data = PlayerData(self.rate_limiter.new_state(now), now)
+        with self._lock:
+            self.player_data[player_id] = data
+            self.player_data.move_to_end(player_id)
+        if self.offences is not None:
+            self.offences.load(player_id)
+        return data
+
+    def get_offence_history(self, player_id: str) -> OffenceHistory:
+        """the player's offences, from memory. with the offence store it's read in when they join, check .loaded if that matters"""
+        if self.offences is not None:
+            return self.offences.history(player_id)
+        with self._lock:
+            history = self._histories.get(player_id)
+            if history is None:
+                history = self._histories[player_id] = OffenceHistory()
+                history.loaded = True
+            return history
+
+    def record_offence(self, player_id: str, kind: str, message: str = "") -> None:
+        """counts an offence against the player, the store writes it to disk later"""
+        if self.offences is not None:
+            self.offences.record(player_id, kind, message)
+            return
+        history = self.get_offence_history(player_id)
+        offence = Offence(time.time(), kind, message)
+        with self._lock:
+            history.add(offence)
+            history.recent.append(offence)
+
+    def allow_message(self, player_id: str) -> bool:
+        """whether the player is under the rate limit, counts the message if they are. call it before checking the message"""
+        return self.rate_limiter.allow(self.get_player_data(player_id).rate_limit)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """drops records nobody touched for idle_timeout seconds, returns how many went"""
+        cutoff = (time.monotonic() if now is None else now) - self.idle_timeout
+        evicted = 0
+        with self._lock:
+            # oldest first, so this stops at the first one still in use
+            while self.player_data:
+                player_id, data = next(iter(self.player_data.items()))
+                if data.last_seen > cutoff:
+                    break
+                del self.player_data[player_id]
+                self._histories.pop(player_id, None)
+                if self.offences is not None:
+                    self.offences.forget(player_id)
+                evicted += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self.player_data)
+
+@dataclass(frozen=True)
+class BreezeChatSnapshot:
+    """copy of a PlayerChatEvent, handed to on_breeze_chat_processed instead of the event when a chat worker moderated it.
+    built on the server thread once the worker is done, with only the players that are still online"""
+    message: str
+    player: endstone.Player
+    format: str
+    recipients: list[endstone.Player]
+
+class BreezeLoadShedder():
+    """keeps chat moving under load by skipping the expensive layers (profanity-check) and relying on the word lists
+
+    tracks a moving average of how long each layer takes plus how many messages are waiting for a chat worker,
+    switches to DEGRADED when either gets too high and back to FULL once both have been low for a bit"""
+    class Mode(Enum):
+        FULL = 0
+        DEGRADED = 1
+
+    expensive_stages = ("Profanity-check",)
+
+    def __init__(
+        self,
+        logger: endstone.Logger | None = None,
+        enabled: bool = True,
+        latency_high: float = 0.05,
+        latency_low: float = 0.02,
+        queue_high: int = 32,
+        queue_low: int = 4,
+        min_degraded_time: float = 5.0,
+        probe_every: int = 20,
+        smoothing: float = 0.2,
+    ):
+        self.logger = logger
+        self.enabled = enabled
+        self.latency_high = latency_high
+        self.latency_low = latency_low
+        self.queue_high = queue_high
+        self.queue_low = queue_low
+        self.min_degraded_time = min_degraded_time
+        self.probe_every = probe_every
+        self.smoothing = smoothing
+
+        self.mode = self.Mode.FULL
+        self.latency: dict[str, float] = {} # moving average per layer, in seconds
+        self.queue_depth = 0
+        self.on_change: Callable[["BreezeLoadShedder.Mode", "BreezeLoadShedder.Mode"], None] | None = None
+
+        self._lock = threading.Lock()
+        self._degraded_since = 0.0
+        self._skipped = 0
+
+    def record(self, stage: str, seconds: float) -> None:
+        previous = self.latency.get(stage)
+        self.latency[stage] = seconds if previous is None else previous + self.smoothing * (seconds - previous)
+
+    def set_queue_depth(self, depth: int) -> None:
+        self.queue_depth = depth
+
+    def should_run(self, stage: str) -> bool:
+        """whether a layer should run for this message"""
+        if not self.enabled or self.mode is self.Mode.FULL or stage not in self.expensive_stages:
+            return True
+
+        # every so often run it anyway, otherwise its average would never come down
+        self._skipped += 1
+        return self.probe_every > 0 and self._skipped % self.probe_every == 0
+
+    def update(self) -> None:
+        """re-evaluates the mode, called after every message"""
+        if not self.enabled:
+            return
+
+        slowest = max((self.latency.get(stage, 0.0) for stage in self.expensive_stages), default=0.0)
+        with self._lock:
+            if self.mode is self.Mode.FULL:
+                if self.queue_depth >= self.queue_high:
+                    self._switch(self.Mode.DEGRADED, f"{self.queue_depth} messages waiting")
+                elif slowest >= self.latency_high:
+                    self._switch(self.Mode.DEGRADED, f"profanity-check averaging {slowest * 1000:.1f}ms")
+            elif (
+                self.queue_depth <= self.queue_low
+                and slowest <= self.latency_low
+                and time.monotonic() - self._degraded_since >= self.min_degraded_time
+            ):
+                self._switch(self.Mode.FULL, "load dropped")
+
+    def _switch(self, mode: "BreezeLoadShedder.Mode", reason: str) -> None:
+        old, self.mode = self.mode, mode
+        if mode is self.Mode.DEGRADED:
+            self._degraded_since = time.monotonic()
+            self._skipped = 0
+            if self.logger is not None:
+                self.logger.warning(f"[BreezeLoadShedder] Chat is falling behind ({reason}), skipping {', '.join(self.expensive_stages)} until load drops")
+        elif self.logger is not None:
+            self.logger.info(f"[BreezeLoadShedder] {reason.capitalize()}, running every check again")
+
+        if self.on_change is not None:
+            try:
+                self.on_change(old, mode)
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.error(f"[BreezeLoadShedder] Error in mode change callback: {e}")
+
+class BreezeMetrics():
+    """where chat time goes: counters plus a fixed-bucket latency histogram per stage (the handler, every profanity layer) and per emitted event
+
+    a histogram is made the first time its stage shows up, after that recording allocates nothing.
+    turned off, record() and count() return straight away"""
+    COUNTERS = ("messages", "censored", "cancelled", "rejected", "shed", "raid", "split")
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: dict[str, LatencyHistogram] = {}
+        self.events: dict[str, LatencyHistogram] = {}
+        self.counters: dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+        self.gauges: dict[str, Callable[[], dict[str, float]]] = {} # name -> stats of something else (caches), read on snapshot
+        self.since = time.time()
+        self._lock = threading.Lock()
+
+    def _record(self, histograms: dict[str, LatencyHistogram], name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def record(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self._record(self.stages, stage, seconds)
+
+    def record_event(self, event_name: str, seconds: float) -> None:
+        """time spent calling every listener of an event, per emit"""
+        if self.enabled:
+            self._record(self.events, event_name, seconds)
+
+    def count(self, counter: str, n: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            for histogram in (*self.stages.values(), *self.events.values()):
+                histogram.reset()
+            self.counters = dict.fromkeys(self.counters, 0)
+            self.since = time.time()
+
+    def add_gauge(self, name: str, gauge: Callable[[], dict[str, float]]) -> None:
+        with self._lock:
+            self.gauges[name] = gauge
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "since": self.since,
+                "seconds": time.time() - self.since,
+                "counters": dict(self.counters),
+                "stages": {name: histogram.snapshot() for name, histogram in self.stages.items()},
+                "events": {name: histogram.snapshot() for name, histogram in self.events.items()},
+                "gauges": {name: gauge() for name, gauge in self.gauges.items()},
+            }
+
+    def format_stats(self) -> list[str]:
+        snapshot = self.snapshot()
+        counters = snapshot["counters"]
+        lines = [
+            f"over {snapshot['seconds']:.0f}s{'' if snapshot['enabled'] else ' (collection is off)'}: "
+            + ", ".join(f"{counters[name]} {name}" for name in counters)
+        ]
+        for kind in ("stages", "events"):
+            for name, stats in snapshot[kind].items():
+                lines.append(
+                    f"{name}: {stats['count']} calls, mean {stats['mean_ms']:.2f}ms, "
+                    f"p50 {stats['p50_ms']:.2f}ms, p99 {stats['p99_ms']:.2f}ms, max {stats['max_ms']:.2f}ms"
+                )
+        for name, stats in snapshot["gauges"].items():
+            lines.append(f"{name}: " + ", ".join(f"{key} {value:.2f}" if isinstance(value, float) else f"{key} {value}" for key, value in stats.items()))
+        return lines
+
+    def dump(self, path: str | os.PathLike) -> None:
+        """writes the snapshot as json, replacing the file in one go so readers never see half of it"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+class BreezeAuditLog():
+    """structured moderation log, one json object per line in moderation.jsonl (who, what they sent, what got through, which layers caught it, timings)
+
+    log() only drops the entry into an in-memory ring buffer, a writer thread flushes it in batches, so chat never waits on the disk.
+    the file is rotated to moderation-<time>.jsonl once it's over max_bytes or older than rotate_seconds, keeping the newest backups.
+    when the writer can't keep up the buffer overwrites its oldest entries, and counts them as dropped"""
+    FILE_NAME = "moderation.jsonl"
+
+    def __init__(
+        self,
+        logger: endstone.Logger | None = None,
+        directory: str | os.PathLike | None = None,
+        max_bytes: int = 16 * 1024 * 1024,
+        rotate_seconds: float = 24 * 60 * 60,
+        backups: int = 7,
+        buffer_size: int = 4096,
+        flush_interval: float = 1.0,
+    ):
+        self.logger = logger
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes # 0 never rotates by size
+        self.rotate_seconds = rotate_seconds # 0 never rotates by age
+        self.backups = backups # 0 keeps every rotated file
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+
+    @property
+    def path(self) -> Path:
+        assert self.directory is not None
+        return self.directory / self.FILE_NAME
+
+    def log(self, entry: dict[str, Any]) -> None:
+        """queues an entry, never blocks on the writer"""
+        buffer = self._buffer
+        with self._lock:
+            if len(buffer) == buffer.maxlen:
+                self.dropped += 1
+            buffer.append(entry)
+            if len(buffer) * 2 < buffer.maxlen: # type: ignore[operator]
+                return
+        # half full, don't wait for the next flush
+        self._wake.set()
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True) # type: ignore[union-attr]
+        self._open()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="breeze-audit-log", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """stops the writer after it's written whatever is still buffered"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"written": self.written, "dropped": self.dropped, "buffered": buffered, "rotations": self.rotations, "errors": self.errors}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """writes out everything buffered in one go. only the writer thread calls this while it's running"""
+        with self._lock:
+            if not self._buffer:
+                batch = None
+            else:
+                batch = list(self._buffer)
+                self._buffer.clear()
+        try:
+            if self._due_for_rotation():
+                self._rotate()
+            if not batch:
+                return
+            if self._file is None:
+                self._open()
+            data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch).encode("utf-8")
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            self.written += len(batch)
+        except OSError as e:
+            # the batch is gone. only the first failure gets logged, the disk is likely to keep failing
+            if batch:
+                self.dropped += len(batch)
+            self.errors += 1
+            if self.errors == 1 and self.logger is not None:
+                self.logger.warning(f"[BreezeAuditLog] Couldn't write to {self.path}: {e}")
+
+    def _open(self) -> None:
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._opened_at = self._first_entry_time() if self._size else time.time()
+
+    def _first_entry_time(self) -> float:
+        """a file left over from the last run is as old as its first entry, so restarts don't keep pushing its rotation back"""
+        try:
+            with open(self.path, "rb") as f:
+                return float(json.loads(f.readline())["time"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return time.time()
+
+    def _due_for_rotation(self) -> bool:
+        if self._file is None or not self._size:
+            return False
+        if self.max_bytes > 0 and self._size >= self.max_bytes:
+            return True
+        return self.rotate_seconds > 0 and time.time() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._opened_at))
+        rotated = self.path.with_name(f"moderation-{stamp}.jsonl")
+        n = 1
+        while rotated.exists():
+            rotated = self.path.with_name(f"moderation-{stamp}-{n}.jsonl")
+            n += 1
+        os.replace(self.path, rotated)
+        self.rotations += 1
+        if self.backups > 0:
+            # oldest first by when they were last written to, the names don't sort right once a second has more than one
+            rotated_files = sorted(self.directory.glob("moderation-*.jsonl"), key=lambda p: p.stat().st_mtime_ns) # type: ignore[union-attr]
+            for old in rotated_files[:-self.backups]:
+                old.unlink(missing_ok=True)
+        self._open()
+
+class BreezeWordLists():
+    """
+    runtime edits to the word lists: the blacklist and whitelist (Extralist) and the longlist
+
+    edits go straight into the live filters, chat keeps being checked while they're applied.
+    they're saved to the data folder as what changed from the lists Breeze ships with, so updates to those still come through
+    """
+    LISTS = ("blacklist", "whitelist", "longlist")
+
+    def __init__(self, logger: endstone.Logger | None = None, path: str | os.PathLike | None = None):
+        self.logger = logger
+        self.path = Path(path) if path is not None else None
+        self.edits: dict[str, dict[str, set[str]]] = {name: {"added": set(), "removed": set()} for name in self.LISTS}
+        self._lock = threading.Lock()
+
+    def _apply(self, list_name: str, words: list[str], add: bool) -> list[str]:
+        if list_name == "blacklist":
+            return pe.add_words(words) if add else pe.remove_words(words)
+        if list_name == "whitelist":
+            return pe.add_whitelisted(words) if add else pe.remove_whitelisted(words)
+        if list_name == "longlist":
+            return pl.add_words(words) if add else pl.remove_words(words)
+        raise ValueError(f"unknown word list {list_name!r}, expected one of {', '.join(self.LISTS)}")
+
+    def _edit(self, list_name: str, words: list[str], add: bool) -> list[str]:
+        with self._lock:
+            changed = self._apply(list_name, words, add)
+            edits = self.edits[list_name]
+            for word in changed:
+                # adding back a shipped word that was removed (or the other way around) just cancels the edit out
+                undo, do = (edits["removed"], edits["added"]) if add else (edits["added"], edits["removed"])
+                if word in undo:
+                    undo.discard(word)
+                else:
+                    do.add(word)
+            if changed:
+                self.save()
+            return changed
 
-    def get_player_data(self, name) -> PlayerData:
-        return self.player_data[name]
+    def add(self, list_name: str, words: list[str]) -> list[str]:
+        """adds words to a list, returns the ones that weren't in it already"""
+        return self._edit(list_name, words, True)
 
-    def remove_player_data(self, name) -> None:
-        if name in self.player_data:
-            del self.player_data[name]
+    def remove(self, list_name: str, words: list[str]) -> list[str]:
+        """removes words from a list, returns the ones that were in it"""
+        return self._edit(list_name, words, False)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        data = {name: {kind: sorted(words) for kind, words in edits.items()} for name, edits in self.edits.items()}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, indent=2))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if self.logger is not None:
+                self.logger.error(f"[Breeze] Couldn't save word list changes to {self.path}: {e}")
+
+    def load(self) -> None:
+        """applies the edits saved in the data folder"""
+        if self.path is None or not self.path.is_file():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            if self.logger is not None:
+                self.logger.error(f"[Breeze] Couldn't read word list changes from {self.path}: {e}")
+            return
+
+        with self._lock:
+            for name in self.LISTS:
+                edits = data.get(name, {}) if isinstance(data, dict) else {}
+                for kind, add in (("added", True), ("removed", False)):
+                    words = [w for w in edits.get(kind, []) if isinstance(w, str)]
+                    self._apply(name, words, add)
+                    self.edits[name][kind].update(w.strip().lower() for w in words if w.strip())
+        if self.logger is not None:
+            total = sum(len(words) for edits in self.edits.values() for words in edits.values())
+            self.logger.info(f"[Breeze] Applied {total} word list changes from {self.path.name}")
 
 class BreezeTextProcessing:
+    load_shedder: BreezeLoadShedder
+    metrics: BreezeMetrics
+
+    def __init__(
+        self,
+        load_shedder: BreezeLoadShedder | None = None,
+        metrics: BreezeMetrics | None = None,
+        verdict_cache: LRUCache[tuple, tuple[str, bool, tuple[str, ...]]] | None = None,
+    ):
+        self.load_shedder = load_shedder if load_shedder is not None else BreezeLoadShedder()
+        # off unless Breeze hands its own in
+        self.metrics = metrics if metrics is not None else BreezeMetrics(enabled=False)
+        # (layers version, text, layers that ran) -> (finished_message, is_bad, caught), None doesn't cache
+        self.verdict_cache = verdict_cache
+        self._verdict_version = 0
+        # near-duplicates across players, None turns it off
+        self.raid_detector: NearDuplicateIndex | None = None
+        self.raid_min_players = 4
+        # raids only get flagged (logged) by the default handler unless this is on, a few players saying "good night everyone" looks the same
+        self.cancel_raids = False
+        # words split across messages only count if the pieces came within split_window seconds of each other, 0 turns it off (the default)
+        self.split_window = 0.0
+        self.split_max_fragment = 4
+        # per thread, the stage timings of the message being handled there (see collect_timings)
+        self._timings = threading.local()
+
+    def collect_timings(self) -> dict[str, float]:
+        """starts collecting how long every stage takes on this thread, into the returned dict (stage -> seconds), until stop_timings"""
+        timings: dict[str, float] = {}
+        self._timings.current = timings
+        return timings
+
+    def stop_timings(self) -> None:
+        self._timings.current = None
+
+    def _record(self, stage: str, seconds: float) -> None:
+        self.metrics.record(stage, seconds)
+        timings = getattr(self._timings, "current", None)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def check_raid(self, text: str, player_id: str) -> NearDuplicate | None:
+        """
+        adds the message to the raid detector's window and returns how many players recently sent something
+        close to it (and how many messages that was). None if the detector is off or the message is too short to tell
+        """
+        detector = self.raid_detector
+        if detector is None:
+            return None
+        started = time.perf_counter()
+        result = detector.check(text, player_id)
+        self._record("Raid", time.perf_counter() - started)
+        if result is not None and result.players >= self.raid_min_players:
+            self.metrics.count("raid")
+        return result
+
+    def check_split(self, text: str, player_data: PlayerData) -> bool:
+        """
+        whether this message finishes a longlist word the player's last message(s) started ("fuc", then "k"), off unless split_window is set
+
+        the matcher state is kept in the player's data between messages, so only the new message gets looked at.
+        call it once per message, in order
+        """
+        if self.split_window <= 0:
+            return False
+        started = time.perf_counter()
+        now = time.monotonic()
+        node = player_data.split_node
+        if player_data.split_version != pl.version or now - player_data.split_at > self.split_window:
+            node = 0
+
+        split, node = pl.continue_scan(scan_tokens(text), node, self.split_max_fragment)
+        # once caught, the pieces don't carry on into the next message
+        player_data.split_node = 0 if split else node
+        player_data.split_at = now
+        player_data.split_version = pl.version
+
+        self._record("Split", time.perf_counter() - started)
+        if split:
+            self.metrics.count("split")
+        return split
+
+    def is_raid(self, text: str, player_id: str) -> bool:
+        """check_raid, but just whether at least raid_min_players players are posting it"""
+        result = self.check_raid(text, player_id)
+        return result is not None and result.players >= self.raid_min_players
+
+    def _layers_version(self) -> int:
+        # every layer's version only goes up, so the sum changes whenever any of them does
+        return pc.version + pe.version + pl.version
+
     def check_and_censor(self, text: str, checks: dict | None = None) -> tuple[str, bool, list]:
         finished_message = text
         defaults = {
@@ -55,58 +935,290 @@ class BreezeTextProcessing:
         else:
             checks = defaults
     
+        # (name in checks/caught, filter, censor options), in the order they're layered
+        stages = (
+            ("Profanity-check", pc, {"neighbors": 2, "window_size": 1}), # profanity check
+            ("Extralist", pe, {"neighbors": 2}), # profanity extralist
+            ("Longlist", pl, {"neighbors": 1}), # profanity longlist
+        )
+        load_shedder = self.load_shedder
+        metrics = self.metrics
+        record = self._record
+
+        # repeated lines ("gg", copy-pasted ads) get the verdict they got last time
+        cache = self.verdict_cache
+        if cache is not None:
+            version = self._layers_version()
+            if version != self._verdict_version:
+                cache.clear()
+                self._verdict_version = version
+            shed = load_shedder.expensive_stages if load_shedder.enabled and load_shedder.mode is BreezeLoadShedder.Mode.DEGRADED else ()
+            hit = cache.get((version, text, tuple(name for name, _, _ in stages if checks[name] and name not in shed)))
+            if hit is not None:
+                return (hit[0], hit[1], list(hit[2]))
 
         caught = []
+        ran = []
         is_bad = False
-        
-        # profanity check
-        if pc.is_profane(text) and checks["Profanity-check"]:
-            is_bad = True
-            caught.append("Profanity-check")
 
-            finished_message = pc.censor(finished_message, neighbors=2, window_size=1)
-                
-        # profanity extralist
-        if pe.is_profane(text) and checks["Extralist"]:
-            is_bad = True
-            caught.append("Extralist")
+        # tokenize once, every layer detects on these and censors into one shared mask
+        original_tokens = scan_tokens(text)
+        tokens = original_tokens
+        censored = [False] * len(tokens)
+        retokenize = drops_characters(text)
+
+        for name, profanity_filter, options in stages:
+            if not checks[name]:
+                continue
+            if not load_shedder.should_run(name):
+                metrics.count("shed")
+                continue
+            ran.append(name)
+
+            # loading the model/word lists isn't the layer being slow, keep it out of the timing
+            profanity_filter.warm_up()
+            started = time.perf_counter()
+            if not profanity_filter.is_profane_tokens(original_tokens):
+                elapsed = time.perf_counter() - started
+                load_shedder.record(name, elapsed)
+                record(name, elapsed)
+                continue
 
-            finished_message = pe.censor(finished_message, neighbors=2)
-            
-        # profanity longlist
-        if pl.is_profane(text) and checks["Longlist"]:
             is_bad = True
-            caught.append("Longlist")
+            caught.append(name)
+
+            # censored tokens count as separators for later layers, the same as the #'s they turn into.
+            # only when the tokenizer dropped characters can the censored text split differently, so just then it gets split again
+            if len(caught) > 1 and retokenize:
+                tokens = scan_tokens(apply_censor_mask(tokens, censored))
+                censored = [False] * len(tokens)
+            tokens = profanity_filter.normalize_tokens(tokens)
+            mask = profanity_filter.censor_mask(tokens, censored, **options)
+            censored = [c or m for c, m in zip(censored, mask)]
+            elapsed = time.perf_counter() - started
+            load_shedder.record(name, elapsed)
+            record(name, elapsed)
+
+        load_shedder.update()
+
+        # rebuild the message once at the end
+        if is_bad:
+            finished_message = apply_censor_mask(tokens, censored)
 
-            finished_message = pl.censor(finished_message, neighbors=1)
+        if cache is not None:
+            # keyed by the layers that actually ran, so a verdict made while shedding never answers a full check
+            cache.put((version, text, tuple(ran)), (finished_message, is_bad, tuple(caught)))
 
         return (finished_message, is_bad, caught)
 
 class BreezeExtensionAPI(): # For extensions to use to interact with Breeze
+    class _Listener:
+        __slots__ = ("func", "is_async", "wait", "timeout", "latency", "errors", "slow_streak", "quarantined")
+
+        def __init__(self, func: Callable[..., Any], wait: bool = False, timeout: float | None = None):
+            self.func = func
+            self.is_async = inspect.iscoroutinefunction(func)
+            self.wait = wait
+            self.timeout = timeout
+
+            # profiling
+            self.latency = LatencyHistogram()
+            self.errors = 0
+            self.slow_streak = 0 # calls in a row over the budget
+            self.quarantined = False
+
+        def stats(self) -> dict[str, Any]:
+            return {
+                "listener": getattr(self.func, "__qualname__", str(self.func)),
+                "module": getattr(self.func, "__module__", None),
+                "calls": self.latency.count,
+                "errors": self.errors,
+                "quarantined": self.quarantined,
+                **self.latency.snapshot(),
+            }
+
     class _EventBus:
-        def __init__(self, logger: endstone.Logger):
-            self.listeners = {}
+        def __init__(self, logger: endstone.Logger, budget: float = 0.005, quarantine_after: int = 5, log_emits: bool = False):
+            # the dispatch table. every registration swaps in a new tuple, so emitting never copies or locks
+            self.listeners: dict[str, tuple["BreezeExtensionAPI._Listener", ...]] = {}
+            self._register_lock = threading.Lock()
             self.logger = logger
 
-        def on(self, event_name, func):
-            self.listeners.setdefault(event_name, []).append(func)
+            # a listener blocking chat for longer than budget seconds, quarantine_after calls in a row, gets disabled (0 never disables)
+            self.budget = budget
+            self.quarantine_after = quarantine_after
+            self.log_emits = log_emits # debug log every call
+            self.metrics: BreezeMetrics | None = None # per-event timing, Breeze sets this
+
+            # async listeners all run on one long-lived loop in its own thread, started the first time it's needed
+            self._loop: asyncio.AbstractEventLoop | None = None
+            self._loop_thread: threading.Thread | None = None
+            self._loop_lock = threading.Lock()
+
+        def on(self, event_name, func, wait: bool = False, timeout: float | None = None):
+            """registers a listener. sync listeners run inline, async listeners are scheduled on Breeze's event loop
+
+            Args:
+                wait (bool, optional): for async listeners, block the emit until it finishes instead of fire-and-forget. defaults to False
+                timeout (float, optional): with wait, how many seconds to wait before giving up on it. defaults to no limit
+            """
+            listener = BreezeExtensionAPI._Listener(func, wait, timeout)
+            with self._register_lock:
+                self.listeners = {**self.listeners, event_name: self.listeners.get(event_name, ()) + (listener,)}
+
+        def has_listeners(self, event_name: str) -> bool:
+            """whether anything listens to the event, so emitters can skip building the arguments"""
+            return event_name in self.listeners
+
+        def _get_loop(self) -> asyncio.AbstractEventLoop:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._loop_thread = threading.Thread(target=loop.run_forever, name="breeze-event-loop", daemon=True)
+                    self._loop_thread.start()
+                    self._loop = loop
+                return self._loop
+
+        def _report(self, event_name: str, listener: "BreezeExtensionAPI._Listener", future: "concurrent.futures.Future[Any]") -> None:
+            if future.cancelled():
+                return
+            e = future.exception()
+            if e is not None:
+                listener.errors += 1
+                self.logger.error(f"Error in event listener for {event_name}: {e}")
+
+        async def _timed(self, listener: "BreezeExtensionAPI._Listener", coro) -> Any:
+            started = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                listener.latency.record(time.perf_counter() - started)
+
+        def _check_budget(self, event_name: str, listener: "BreezeExtensionAPI._Listener", blocked: float) -> None:
+            if blocked <= self.budget:
+                listener.slow_streak = 0
+                return
+
+            listener.slow_streak += 1
+            if self.quarantine_after > 0 and listener.slow_streak >= self.quarantine_after:
+                listener.quarantined = True
+                self.logger.warning(
+                    f"[BreezeExtensionAPI] Quarantined {listener.func} for {event_name}: it went over the {self.budget * 1000:.1f}ms budget "
+                    f"{listener.slow_streak} times in a row (last one took {blocked * 1000:.1f}ms). It won't be called anymore."
+                )
 
         def _emit(self, event_name, *args, **kwargs):
-            for func in list(self.listeners.get(event_name, [])):
+            metrics = self.metrics
+            emit_started = time.perf_counter()
+            for listener in self.listeners.get(event_name, ()):
+                if listener.quarantined:
+                    continue
+
+                func = listener.func
+                started = time.perf_counter()
                 try:
-                    if inspect.iscoroutinefunction(func):
-                        asyncio.run(func(*args, **kwargs))
+                    if listener.is_async:
+                        future = asyncio.run_coroutine_threadsafe(self._timed(listener, func(*args, **kwargs)), self._get_loop())
+                        if listener.wait:
+                            try:
+                                future.result(listener.timeout)
+                            except concurrent.futures.TimeoutError:
+                                future.cancel()
+                                listener.errors += 1
+                                self.logger.warning(f"Event listener {func} for {event_name} took longer than {listener.timeout}s, cancelled it")
+                        else:
+                            future.add_done_callback(functools.partial(self._report, event_name, listener))
                     else:
-                        func(*args, **kwargs)
+                        try:
+                            func(*args, **kwargs)
+                        finally:
+                            listener.latency.record(time.perf_counter() - started)
                 except Exception as e:
+                    listener.errors += 1
                     self.logger.error(f"Error in event listener for {event_name}: {e}")
-                self.logger.info(f"[BreezeExtensionAPI] Emitted to {str(func)}")
+
+                # only the time chat was actually held up counts against the budget
+                self._check_budget(event_name, listener, time.perf_counter() - started)
+                if self.log_emits:
+                    self.logger.debug(f"[BreezeExtensionAPI] Emitted to {str(func)}")
+
+            if metrics is not None:
+                metrics.record_event(event_name, time.perf_counter() - emit_started)
+
+        def release(self, func: Callable[..., Any]) -> bool:
+            """takes a listener out of quarantine, returns True if it was quarantined"""
+            released = False
+            for listeners in self.listeners.values():
+                for listener in listeners:
+                    if listener.func is func and listener.quarantined:
+                        listener.quarantined = False
+                        listener.slow_streak = 0
+                        released = True
+            return released
+
+        def stats(self) -> dict[str, list[dict[str, Any]]]:
+            """call counts, errors and latency of every listener, per event"""
+            return {event_name: [listener.stats() for listener in listeners] for event_name, listeners in self.listeners.items()}
+
+        def format_stats(self) -> list[str]:
+            lines = []
+            for event_name, listeners in self.stats().items():
+                for stats in listeners:
+                    lines.append(
+                        f"{event_name} -> {stats['listener']}: {stats['calls']} calls, {stats['errors']} errors, "
+                        f"p50 {stats['p50_ms']:.2f}ms, p99 {stats['p99_ms']:.2f}ms, max {stats['max_ms']:.2f}ms"
+                        + (" (quarantined)" if stats["quarantined"] else "")
+                    )
+            return lines
+
+        def log_stats(self) -> None:
+            for line in self.format_stats():
+                self.logger.info(f"[BreezeExtensionAPI] {line}")
+
+        def shutdown(self, timeout: float = 2.0) -> None:
+            """cancels whatever async listeners are still running and stops the event loop"""
+            with self._loop_lock:
+                loop, thread = self._loop, self._loop_thread
+                self._loop = self._loop_thread = None
+            if loop is None or thread is None:
+                return
+
+            async def _cancel_pending():
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            try:
+                asyncio.run_coroutine_threadsafe(_cancel_pending(), loop).result(timeout)
+            except Exception as e:
+                self.logger.warning(f"[BreezeExtensionAPI] Some async listeners didn't stop in time: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
 
     class HandlerInput(TypedDict):
+        """
+        everything here is read on the server thread before the handler runs, so a handler on a chat worker never has to touch the server
+
+        message (str): The message the player sent.
+        chat_format (str): The chat format of the event.
+        player_uuid (str): The sender's uuid, str(player.unique_id). What player data is keyed by.
+        player_name (str): The sender's name when they sent it.
+        reply (Callable[[str], None]): Sends the sender a message, on the server thread (if they're still online).
+        run_on_main (Callable[[Callable[[], None]], None]): Runs a function on the server thread, for anything else that calls into the server.
+        player (endstone.Player, optional): The sender. Only there when chat is moderated on the server thread ([moderation] workers = 0).
+        recipients (list[endstone.Player], optional): Who the message goes to. Only there with workers = 0, like player.
+        """
         message: str
-        player: endstone.Player
         chat_format: str
-        recipients: list[endstone.Player]
+        player_uuid: str
+        player_name: str
+        reply: Callable[[str], None]
+        run_on_main: Callable[[Callable[[], None]], None]
+        player: NotRequired[endstone.Player]
+        recipients: NotRequired[list[endstone.Player]]
 
     class HandlerOutput(TypedDict):
         """
@@ -114,13 +1226,19 @@ class BreezeExtensionAPI(): # For extensions to use to interact with Breeze
         fully_cancel_message (bool): Wether to fully cancel the message. (i.e. not send anything)
         finished_message (str): The final message after processing. (e.g. "[tag] <player> i #### you!")
         original_message (str): The original message before processing. (e.g. "[tag] <player> i hate you!")
+        caught (list[str], optional): The layers that caught the message, for the moderation log. (e.g. ["Extralist"])
+        reason (str, optional): Why the message was cancelled (or flagged), for the moderation log.
+        log (bool, optional): Put the message in the moderation log even if it wasn't bad or cancelled.
         """
         is_bad: bool
         fully_cancel_message: bool
         finished_message: str
         original_message: str
+        caught: NotRequired[list[str]]
+        reason: NotRequired[str]
+        log: NotRequired[bool]
 
-    def __init__(self, logger: endstone.Logger, pdm: "PlayerDataManager | None" = None, btp: "BreezeTextProcessing | None" = None):
+    def __init__(self, logger: endstone.Logger, pdm: "PlayerDataManager | None" = None, btp: "BreezeTextProcessing | None" = None, event_bus: "BreezeExtensionAPI._EventBus | None" = None):
         self.plugin = None
         self.ready = False
         self.logger = logger
@@ -128,12 +1246,27 @@ class BreezeExtensionAPI(): # For extensions to use to interact with Breeze
         self.pdm = pdm
         self.btp = btp
 
-        self._event_bus = self._EventBus(logger)
+        # extensions get Breeze's own bus, so whatever they register actually hears Breeze's events
+        self._event_bus = event_bus if event_bus is not None else self._EventBus(logger)
 
     @property
     def eventbus(self):
         return self._event_bus
 
+    @property
+    def word_lists(self) -> "BreezeWordLists | None":
+        """add and remove blacklist, whitelist and longlist words at runtime, changes are saved to Breeze's data folder"""
+        return getattr(self.plugin, "word_lists", None)
+
+    @property
+    def moderation_mode(self) -> str:
+        """"full" when every check runs, "degraded" when Breeze is skipping profanity-check because chat is falling behind.
+        
+        Listen to "on_breeze_mode_changed" on the event bus to hear about changes."""
+        if self.btp is None:
+            return "full"
+        return self.btp.load_shedder.mode.name.lower()
+
     def on_breeze_chat_event(self, event:PlayerChatEvent, plugin):
         """Called when a chat event is processed by Breeze. 
         
@@ -141,18 +1274,19 @@ class BreezeExtensionAPI(): # For extensions to use to interact with Breeze
         if not self.ready:
             return
 
-        self._event_bus._emit("on_breeze_chat_event", event, plugin); self.logger.info("[BreezeExtensionAPI] on_breeze_chat_event")
+        self._event_bus._emit("on_breeze_chat_event", event, plugin)
 
         return event, plugin
 
     def on_breeze_chat_processed(self, event:PlayerChatEvent, handler_output: "BreezeExtensionAPI.HandlerOutput", is_bad:bool, plugin:Plugin):
         """Called after Breeze has processed a chat event. Breeze is a dictionary of values from Breeze's message evaluation and stuff. 
         
-        Extensions can hook into this to do extra functions but they can NOT modify management."""
+        Extensions can hook into this to do extra functions but they can NOT modify management.
+        With [moderation] workers on, event is a BreezeChatSnapshot instead, and this isn't called if the player left before their message was done."""
         if not self.ready:
             return
 
-        self._event_bus._emit("on_breeze_chat_processed", event, handler_output, is_bad, plugin); self.logger.info("[BreezeExtensionAPI] on_breeze_chat_processed")
+        self._event_bus._emit("on_breeze_chat_processed", event, handler_output, is_bad, plugin)
 
         return event, handler_output, is_bad, plugin
     
@@ -171,11 +1305,13 @@ class BreezeModuleManager():
             DEFAULT = 1
             CUSTOM = 2
 
-    def __init__(self, logger: endstone.Logger, pdm: PlayerDataManager, btp: BreezeTextProcessing, use_cwd_for_extra=False):
+    def __init__(self, logger: endstone.Logger, pdm: PlayerDataManager, btp: BreezeTextProcessing, event_bus: "BreezeExtensionAPI._EventBus | None" = None, use_cwd_for_extra=False):
         self.use_cwd_for_extra = use_cwd_for_extra
+        self.event_bus = event_bus
         self.is_breeze_installed = False
         self.breeze_installation_path = None
         self.extension_files = []
+        self.extension_apis: list[BreezeExtensionAPI] = []
         self.logger = logger
         self.pdm = pdm
         self.btp = btp
@@ -184,45 +1320,70 @@ class BreezeModuleManager():
         self.handler = None
 
     def _default_handler(self, handler_input: BreezeExtensionAPI.HandlerInput, player_data_manager: PlayerDataManager, breeze_text_processing: BreezeTextProcessing) -> BreezeExtensionAPI.HandlerOutput:
-        sender_uuid = str(handler_input["player"].unique_id)
+        sender_uuid = handler_input["player_uuid"]
         finished_message = handler_input["message"]
 
-        local_player_data = player_data_manager.get_player_data(handler_input["player"].name)
+        local_player_data = player_data_manager.get_player_data(sender_uuid)
         is_bad = False
         fully_cancel_message = (False, "")
         caught = []
         should_check_message = True
         worthy_to_log = False
+        offence = None # what to count against the player, if anything
 
-        # spam check
-        if time.monotonic() - local_player_data["latest_time_a_message_was_sent"] < 0.5:
+        # spam check, before any filter runs
+        if not player_data_manager.allow_message(sender_uuid):
             fully_cancel_message = (True, "spam, gave displayed cancel")
             should_check_message = False
-            handler_input["player"].send_message("You're sending messages too fast!")
+            handler_input["reply"]("You're sending messages too fast!")
+
+        # the same message (give or take a few characters) from a bunch of players at once
+        # flagged for the moderation log, only cancelled with cancel_raids on, and never counted against the player
+        if not fully_cancel_message[0] and breeze_text_processing.is_raid(handler_input["message"], sender_uuid):
+            fully_cancel_message = (breeze_text_processing.cancel_raids, "raid, near-duplicate of other players' messages")
+            worthy_to_log = True
+            if fully_cancel_message[0]:
+                handler_input["reply"]("Lots of players are sending that same message right now, so yours wasn't sent.")
+
+        # the end of a word started in the player's last message(s)
+        if not fully_cancel_message[0] and breeze_text_processing.check_split(handler_input["message"], local_player_data):
+            fully_cancel_message = (True, "finishes a word split across messages")
+            is_bad = True
+            caught.append("Split")
 
         if fully_cancel_message[0]:
             should_check_message = False
         
         if should_check_message: 
             finished_message, is_bad, caught = breeze_text_processing.check_and_censor(handler_input["message"])
+            # only the filters' verdict counts against the player, a split word on its own can be two innocent messages
+            if is_bad:
+                offence = "profanity"
 
         # finally, after checking send the message and some extra stuff
         if is_bad:
             worthy_to_log = True
 
+        # kept across sessions, so repeat offenders don't start fresh when they reconnect
+        if offence is not None:
+            player_data_manager.record_offence(sender_uuid, offence, handler_input["message"])
+
         if not fully_cancel_message[0]:
             pass
         else:
             if randint(1, 3) == 1:
                 worthy_to_log = True
 
-        player_data_manager.update_player_data(handler_input["player"].name, handler_input["message"])
+        player_data_manager.update_player_data(sender_uuid, handler_input["message"])
 
         return {
             "is_bad": is_bad,
             "fully_cancel_message": fully_cancel_message[0],
             "finished_message": finished_message,
-            "original_message": handler_input["message"]
+            "original_message": handler_input["message"],
+            "caught": caught,
+            "reason": fully_cancel_message[1],
+            "log": worthy_to_log,
         }
             
     def _install_breeze(self, path: Path):
@@ -326,7 +1487,9 @@ class BreezeModuleManager():
             if hasattr(module, "on_load"):
                 try:
                     # pdm and btp re-passed for extensions if they use BreezeExtensionAPI
-                    module.on_load(BreezeExtensionAPI(self.logger, self.pdm, self.btp)) 
+                    extension_api = BreezeExtensionAPI(self.logger, self.pdm, self.btp, event_bus=self.event_bus)
+                    self.extension_apis.append(extension_api)
+                    module.on_load(extension_api) 
                     self.logger.info(f"BreezeModuleManager: Extension {module_name} initialized via on_load()")
                 except Exception as e:
                     self.logger.error(f"BreezeModuleManager: Error in on_load() of {module_name}: {e}")
@@ -358,15 +1521,94 @@ class BreezeModuleManager():
         else:
             self.logger.info("[BreezeModuleManager] Using custom handler.") 
 
+class BreezeChatWorkers():
+    """worker threads that run chat moderation off the server thread
+
+    every player always lands on the same worker, so one player's messages are handled (and handed back) in the order they were sent"""
+    def __init__(self, logger: endstone.Logger, workers: int, max_queue: int):
+        self.logger = logger
+        self.rejected = 0
+        self._queues: list[queue.Queue[Callable[[], None] | None]] = [queue.Queue(maxsize=max_queue) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"breeze-chat-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"[BreezeChatWorkers] Started {len(self._threads)} chat workers")
+
+    def submit(self, key: str, job: Callable[[], None]) -> bool:
+        """queues a job on the key's worker, returns False if that worker's queue is full"""
+        try:
+            self._queues[hash(key) % len(self._queues)].put_nowait(job)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        return True
+
+    def queued(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def _run(self, q: "queue.Queue[Callable[[], None] | None]") -> None:
+        while True:
+            job = q.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                self.logger.error(f"[BreezeChatWorkers] Error while handling a message: {e}")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        for q in self._queues:
+            try:
+                q.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        for thread in self._threads:
+            thread.join(timeout)
+
 class Breeze(Plugin): #PLUGIN
     bea: BreezeExtensionAPI
     bmm: BreezeModuleManager
     pdm: PlayerDataManager
     btp: BreezeTextProcessing
+    metrics: BreezeMetrics
+    chat_workers: BreezeChatWorkers | None
+
+    commands = {
+        "breeze": {
+            "description": "Shows where Breeze spends its time moderating chat, and edits its word lists",
+            "usages": [
+                "/breeze (stats|listeners)<view: BreezeStatsView>",
+                "/breeze (metrics)<metrics: BreezeMetricsCommand> (on|off|reset|dump)<action: BreezeMetricsAction>",
+                "/breeze (words)<words: BreezeWordsCommand> (add|remove)<action: BreezeWordsAction> (blacklist|whitelist|longlist)<list: BreezeWordList> <word: str>",
+                "/breeze (words)<words: BreezeWordsCommand> (blacklist|whitelist|longlist)<list: BreezeWordList>",
+            ],
+            "permissions": ["breeze.command.breeze"],
+        }
+    }
+
+    permissions = {
+        "breeze.command.breeze": {
+            "description": "Allows using /breeze",
+            "default": "op",
+        }
+    }
 
     def on_enable(self) -> None:
         self.logger.info("Enabling Breeze")
         self.installation_path = Path(self.data_folder).resolve()
+        self.save_default_config()
+        set_cache_dir(self.installation_path / "cache")
+        # word list changes made with /breeze words (or by extensions) since the lists were shipped
+        self.word_lists.logger = self.logger
+        self.word_lists.path = self.installation_path / "word_lists.json"
+        self.word_lists.load()
+        if bool(self.setting("startup", "warm_up", True)):
+            threading.Thread(target=self._warm_up, name="breeze-warm-up", daemon=True).start()
         self.register_events(self)
         current_directory = os.getcwd()
         self.server.logger.info(f"{current_directory}, {__file__}")
@@ -374,20 +1616,274 @@ class Breeze(Plugin): #PLUGIN
         # pdm and btp are re-passed to the extension API
         self.logger.info('extensionapiing'); self.bea = BreezeExtensionAPI(self.logger, pdm=self.pdm, btp=self.btp); self.bea.initialize(self)
 
-        self.logger.info('modulemanagering'); self.bmm = BreezeModuleManager(logger=self.logger, pdm=self.pdm, btp=self.btp); self.bmm.start(self.installation_path)
-
-        
+        # listener budgets
+        self.bea.eventbus.budget = float(self.setting("extensions", "listener_budget_ms", 5)) / 1000
+        self.bea.eventbus.quarantine_after = int(self.setting("extensions", "quarantine_after", 5))
+        self.bea.eventbus.log_emits = bool(self.setting("extensions", "log_emits", False))
+
+        # extensions share Breeze's event bus
+        self.logger.info('modulemanagering'); self.bmm = BreezeModuleManager(logger=self.logger, pdm=self.pdm, btp=self.btp, event_bus=self.bea.eventbus); self.bmm.start(self.installation_path)
+        for extension_api in self.bmm.extension_apis:
+            extension_api.initialize(self)
+
+        # skip profanity-check while chat is falling behind
+        self.btp.load_shedder = BreezeLoadShedder(
+            self.logger,
+            enabled=bool(self.setting("load_shedding", "enabled", True)),
+            latency_high=float(self.setting("load_shedding", "latency_high_ms", 50)) / 1000,
+            latency_low=float(self.setting("load_shedding", "latency_low_ms", 20)) / 1000,
+            queue_high=int(self.setting("load_shedding", "queue_high", 32)),
+            queue_low=int(self.setting("load_shedding", "queue_low", 4)),
+            min_degraded_time=float(self.setting("load_shedding", "min_degraded_seconds", 5)),
+            probe_every=int(self.setting("load_shedding", "probe_every", 20)),
+        )
+        self.btp.load_shedder.on_change = self._on_moderation_mode_change
+
+        # near-duplicate messages from many players
+        if bool(self.setting("raid_detection", "enabled", True)):
+            self.btp.raid_detector = NearDuplicateIndex(
+                window=float(self.setting("raid_detection", "window_seconds", 30)),
+                min_similarity=float(self.setting("raid_detection", "min_similarity", 0.5)),
+                min_length=int(self.setting("raid_detection", "min_length", 12)),
+            )
+            self.btp.raid_min_players = int(self.setting("raid_detection", "min_players", 4))
+            self.btp.cancel_raids = bool(self.setting("raid_detection", "cancel", False))
+
+        # words split across messages
+        if bool(self.setting("split_words", "enabled", False)):
+            self.btp.split_window = float(self.setting("split_words", "window_seconds", 10))
+            self.btp.split_max_fragment = int(self.setting("split_words", "max_fragment", 4))
+        else:
+            self.btp.split_window = 0
+
+        # repeated lines skip the filters
+        cache_size = int(self.setting("verdict_cache", "size", 4096))
+        cache_ttl = float(self.setting("verdict_cache", "ttl_seconds", 300))
+        if cache_size > 0:
+            self.btp.verdict_cache = LRUCache(cache_size, ttl=cache_ttl if cache_ttl > 0 else None)
+            self.metrics.add_gauge("verdict_cache", self.btp.verdict_cache.stats)
+        self.metrics.add_gauge("window_cache", pc.window_cache.stats)
+
+        # spam limits, PlayerDataManager.allow_message
+        self.pdm.rate_limiter = RateLimiter(
+            rate=float(self.setting("rate_limit", "per_second", 1.0)),
+            burst=float(self.setting("rate_limit", "burst", 4)),
+            window=float(self.setting("rate_limit", "window_seconds", 10)),
+            window_max=int(self.setting("rate_limit", "window_max", 8)),
+        )
+
+        # drop player data nobody touched in a while, quits get missed on crashes and kicks
+        self.pdm.logger = self.logger
+        self.pdm.idle_timeout = float(self.setting("player_data", "idle_seconds", 600))
+        self.pdm.max_players = int(self.setting("player_data", "max_players", 10000))
+        sweep_ticks = max(1, int(float(self.setting("player_data", "sweep_seconds", 60)) * 20))
+        self._evict_task = self.server.scheduler.run_task(self, self._evict_idle_players, delay=sweep_ticks, period=sweep_ticks)
+
+        # offence history, kept across reconnects and restarts
+        if bool(self.setting("offence_history", "enabled", True)):
+            offences = BreezeOffenceStore(
+                self.logger,
+                self.installation_path / str(self.setting("offence_history", "file", "offences.db")),
+                recent=int(self.setting("offence_history", "recent", 20)),
+                flush_interval=float(self.setting("offence_history", "flush_seconds", 2)),
+                max_pending=int(self.setting("offence_history", "max_pending", 10000)),
+            )
+            try:
+                offences.start()
+            except sqlite3.Error as e:
+                self.logger.error(f"[Breeze] Couldn't open the offence history, it won't be kept past a player leaving: {e}")
+            else:
+                self.pdm.offences = offences
+                self.metrics.add_gauge("offence_history", offences.stats)
+
+        # moderation log, written off the chat path
+        if bool(self.setting("audit_log", "enabled", True)):
+            self.audit_log = BreezeAuditLog(
+                self.logger,
+                self.installation_path / "audit",
+                max_bytes=int(float(self.setting("audit_log", "max_file_mb", 16)) * 1024 * 1024),
+                rotate_seconds=float(self.setting("audit_log", "rotate_hours", 24)) * 3600,
+                backups=int(self.setting("audit_log", "backups", 7)),
+                buffer_size=int(self.setting("audit_log", "buffer_size", 4096)),
+                flush_interval=float(self.setting("audit_log", "flush_seconds", 1)),
+            )
+            self.audit_log_all = bool(self.setting("audit_log", "log_all", False))
+            try:
+                self.audit_log.start()
+                self.metrics.add_gauge("audit_log", self.audit_log.stats)
+            except OSError as e:
+                self.logger.error(f"[Breeze] Couldn't open the moderation log: {e}")
+                self.audit_log = None
+
+        # per-stage timing, /breeze stats shows it
+        self.metrics.enabled = bool(self.setting("metrics", "enabled", True))
+        self.bea.eventbus.metrics = self.metrics
+        dump_interval = float(self.setting("metrics", "dump_interval_seconds", 0))
+        if dump_interval > 0:
+            self._metrics_dump_stop.clear()
+            threading.Thread(target=self._dump_metrics_every, args=(dump_interval,), name="breeze-metrics-dump", daemon=True).start()
+
+        # off-thread moderation, only the broadcast/cancel gets handed back to the server thread
+        workers = int(self.setting("moderation", "workers", 0))
+        if workers > 0:
+            self.chat_workers = BreezeChatWorkers(self.logger, workers, int(self.setting("moderation", "max_queue", 64)))
+            self.chat_workers.start()
+
+    def on_disable(self) -> None:
+        if self._evict_task is not None:
+            self._evict_task.cancel()
+            self._evict_task = None
+
+        if self.chat_workers is not None:
+            self.chat_workers.stop()
+            self.chat_workers = None
+
+        self._metrics_dump_stop.set()
+
+        # after the chat workers, so whatever they were still handling gets written too
+        if self.audit_log is not None:
+            self.audit_log.close()
+            self.audit_log = None
+        if self.pdm.offences is not None:
+            self.pdm.offences.close()
+            self.pdm.offences = None
+
+        # dump listener stats, then stop the event loop async listeners run on
+        self.bea.eventbus.log_stats()
+        self.bea.eventbus.shutdown()
 
     def __init__(self):
         super().__init__()
         self.pdm = PlayerDataManager()
-        self.btp = BreezeTextProcessing()
+        self.metrics = BreezeMetrics()
+        self.btp = BreezeTextProcessing(metrics=self.metrics)
+        self.chat_workers = None
+        self.word_lists = BreezeWordLists()
+        self.audit_log: BreezeAuditLog | None = None
+        self.audit_log_all = False
+        self._metrics_dump_stop = threading.Event()
+        self._evict_task = None
+
+    def setting(self, section: str, key: str, default):
+        """reads a value from config.toml, falling back to the default if it (or the whole file) is missing"""
+        try:
+            return self.config.get(section, {}).get(key, default)
+        except Exception:
+            return default
+
+    def _warm_up(self) -> None:
+        """loads the filters in the background so the server doesn't wait on them, and the first message doesn't either"""
+        start = time.perf_counter()
+        for f in (pl, pe, pc):
+            try:
+                f.warm_up()
+            except Exception as e:
+                self.logger.error(f"[Breeze] Failed to warm up {type(f).__name__}: {e}")
+                return
+        self.logger.info(f"[Breeze] Profanity filters ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _evict_idle_players(self) -> None:
+        evicted = self.pdm.evict_idle()
+        if evicted:
+            self.logger.debug(f"[Breeze] Dropped {evicted} idle player records, {len(self.pdm)} left")
+
+    def metrics_file(self) -> Path:
+        return self.installation_path / str(self.setting("metrics", "dump_file", "metrics.json"))
+
+    def _dump_metrics_every(self, interval: float) -> None:
+        """runs on its own thread, so writing the file never holds up the server"""
+        while not self._metrics_dump_stop.wait(interval):
+            if not self.metrics.enabled:
+                continue
+            try:
+                self.metrics.dump(self.metrics_file())
+            except OSError as e:
+                self.logger.warning(f"[Breeze] Couldn't write metrics to {self.metrics_file()}: {e}")
+
+    def on_command(self, sender: CommandSender, command: Command, args: list[str]) -> bool:
+        if command.name != "breeze":
+            return False
+
+        view = args[0] if args else "stats"
+        if view == "stats":
+            lines = self.metrics.format_stats()
+            lines.append(f"moderation mode: {self.btp.load_shedder.mode.name.lower()}")
+            if self.chat_workers is not None:
+                lines.append(f"chat workers: {self.chat_workers.queued()} queued")
+        elif view == "listeners":
+            lines = self.bea.eventbus.format_stats() or ["no extension listeners"]
+        elif view == "metrics" and len(args) > 1:
+            action = args[1]
+            if action == "on":
+                self.metrics.enabled = True
+                lines = ["metrics collection is on"]
+            elif action == "off":
+                self.metrics.enabled = False
+                lines = ["metrics collection is off"]
+            elif action == "reset":
+                self.metrics.reset()
+                lines = ["metrics reset"]
+            elif action == "dump":
+                try:
+                    self.metrics.dump(self.metrics_file())
+                except OSError as e:
+                    sender.send_error_message(f"Couldn't write metrics: {e}")
+                    return True
+                lines = [f"metrics written to {self.metrics_file()}"]
+            else:
+                sender.send_error_message(f"Unknown metrics action: {action}")
+                return False
+        elif view == "words" and len(args) > 1:
+            if args[1] in BreezeWordLists.LISTS:
+                edits = self.word_lists.edits[args[1]]
+                lines = [
+                    f"{args[1]}: added {', '.join(sorted(edits['added'])) or 'nothing'}",
+                    f"{args[1]}: removed {', '.join(sorted(edits['removed'])) or 'nothing'}",
+                ]
+            elif args[1] in ("add", "remove") and len(args) > 3 and args[2] in BreezeWordLists.LISTS:
+                action, list_name, word = args[1], args[2], args[3]
+                changed = self.word_lists.add(list_name, [word]) if action == "add" else self.word_lists.remove(list_name, [word])
+                if changed:
+                    lines = [f"{'added' if action == 'add' else 'removed'} {changed[0]} {'to' if action == 'add' else 'from'} the {list_name}"]
+                else:
+                    lines = [f"{word} is already in the {list_name}" if action == "add" else f"{word} isn't in the {list_name}"]
+            else:
+                sender.send_error_message("Usage: /breeze words <add|remove> <blacklist|whitelist|longlist> <word>")
+                return False
+        else:
+            sender.send_error_message(f"Unknown /breeze view: {view}")
+            return False
+
+        for line in lines:
+            sender.send_message(f"{ColorFormat.GRAY}[Breeze]{ColorFormat.RESET} {line}")
+        return True
+
+    def _on_moderation_mode_change(self, old: BreezeLoadShedder.Mode, new: BreezeLoadShedder.Mode) -> None:
+        if self.bea.eventbus.has_listeners("on_breeze_mode_changed"):
+            self.run_on_main(lambda: self.bea.eventbus._emit("on_breeze_mode_changed", new.name.lower(), self))
+
+    def run_on_main(self, func: Callable[[], None]) -> None:
+        """runs func on the server thread, straight away if there are no chat workers"""
+        if self.chat_workers is None:
+            func()
+        else:
+            self.server.scheduler.run_task(self, func)
+
+    def send_to_player(self, player_id: str, message: str) -> None:
+        """sends a player (by uuid) a message on the server thread, if they're still online. safe to call from a chat worker"""
+        def send() -> None:
+            player = self.server.get_player(uuid.UUID(player_id))
+            if player is not None:
+                player.send_message(message)
+        self.run_on_main(send)
 
     def handle(self, handler_input: BreezeExtensionAPI.HandlerInput) -> BreezeExtensionAPI.HandlerOutput:
+        started = time.perf_counter()
+        timings = self.btp.collect_timings() if self.audit_log is not None else None
         raw = None
         try:
+            # no custom handler (BreezeModuleManager.start already said so)
             if self.bmm.handler is None:
-                self.logger.warning("No handler found, using default handler")
                 raw = self.bmm._default_handler(handler_input=handler_input, player_data_manager=self.pdm, breeze_text_processing=self.btp)
             else:
                 raw = self.bmm.handler(handler_input=handler_input, player_data_manager=self.pdm, breeze_text_processing=self.btp)
@@ -403,36 +1899,105 @@ class Breeze(Plugin): #PLUGIN
             if key not in raw:
                 self.logger.warning(f"handler output missing key '{key}', filling default")
                 raw[key] = None  # or some sane default
-        
+
+        elapsed = time.perf_counter() - started
+        self.metrics.record("handler", elapsed)
+        if timings is not None:
+            self.btp.stop_timings()
+            self._audit(handler_input, raw, elapsed, timings)
         return cast(BreezeExtensionAPI.HandlerOutput, raw)
+
+    def _audit(self, handler_input: BreezeExtensionAPI.HandlerInput, handled: dict, elapsed: float, timings: dict[str, float]) -> None:
+        """hands the message to the moderation log if it's worth logging, the file is written on the audit log's own thread"""
+        audit_log = self.audit_log
+        if audit_log is None:
+            return
+        if not (self.audit_log_all or handled.get("is_bad") or handled.get("fully_cancel_message") or handled.get("log")):
+            return
+        # the values captured on the server thread, this may be running on a chat worker
+        audit_log.log({
+            "time": time.time(),
+            "uuid": handler_input["player_uuid"],
+            "player": handler_input["player_name"],
+            "message": handler_input["message"],
+            "finished_message": handled.get("finished_message"),
+            "is_bad": bool(handled.get("is_bad")),
+            "cancelled": bool(handled.get("fully_cancel_message")),
+            "reason": handled.get("reason") or None,
+            "caught": list(handled.get("caught") or ()),
+            "mode": self.btp.load_shedder.mode.name.lower(),
+            "handler_ms": round(elapsed * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        })
     
     @event_handler
     def on_player_quit(self, event: PlayerQuitEvent):
         player = event.player
-        self.pdm.remove_player_data(player.name)
+        self.pdm.remove_player_data(str(player.unique_id))
 
     @event_handler
     def on_player_join(self, event: PlayerJoinEvent):
-        pdata = self.pdm.get_player_data(event.player.name)
-        pdata["latest_time_a_message_was_sent"] = time.monotonic() - 10
-        pdata["last_message"] = ""
+        self.pdm.reset_player_data(str(event.player.unique_id))
       
     @event_handler(priority=EventPriority(1))
     def on_chat_sent_by_player(self, event: PlayerChatEvent):
         event.cancel()
-        self.bea.eventbus._emit("on_breeze_chat_event", event, self)
+        self.metrics.count("messages")
+        bus = self.bea.eventbus
+        if bus.has_listeners("on_breeze_chat_event"):
+            bus._emit("on_breeze_chat_event", event, self)
 
+        # read here, on the server thread. a handler on a chat worker only gets these plain values
+        player = event.player
+        player_id = str(player.unique_id)
+        player_name = player.name
         h_input: BreezeExtensionAPI.HandlerInput = {
             "message": event.message,
-            "player": event.player,
             "chat_format": event.format,
-            "recipients": event.recipients
+            "player_uuid": player_id,
+            "player_name": player_name,
+            "reply": functools.partial(self.send_to_player, player_id),
+            "run_on_main": self.run_on_main,
         }
 
-        handled = self.handle(h_input)
-
-        self.bea.eventbus._emit("on_breeze_chat_processed", event, handled, handled["is_bad"], self)
+        if self.chat_workers is None:
+            # on the server thread anyway, handlers that use the player and recipients keep working
+            h_input["player"] = player
+            h_input["recipients"] = event.recipients
+            handled = self.handle(h_input)
+            self._finish_chat(event, player_name, handled)
+            return
 
+        # the event (and maybe the players) are gone by the time the worker is done, keep the uuids and look them up again then
+        recipient_ids = [recipient.unique_id for recipient in event.recipients]
+
+        def moderate() -> None:
+            handled = self.handle(h_input)
+            self.run_on_main(lambda: self._finish_worker_chat(h_input, recipient_ids, handled))
+
+        self.btp.load_shedder.set_queue_depth(self.chat_workers.queued())
+        if not self.chat_workers.submit(player_id, moderate):
+            self.metrics.count("rejected")
+            event.player.send_message("Chat is busy right now, try again in a moment!")
+
+    def _finish_worker_chat(self, h_input: BreezeExtensionAPI.HandlerInput, recipient_ids: list[uuid.UUID], handled: BreezeExtensionAPI.HandlerOutput) -> None:
+        chat = None
+        if self.bea.eventbus.has_listeners("on_breeze_chat_processed"):
+            # the player can quit while a worker has their message, listeners only ever get players that are still online
+            player = self.server.get_player(uuid.UUID(h_input["player_uuid"]))
+            if player is not None:
+                recipients = [recipient for recipient in map(self.server.get_player, recipient_ids) if recipient is not None]
+                chat = BreezeChatSnapshot(message=h_input["message"], player=player, format=h_input["chat_format"], recipients=recipients)
+        self._finish_chat(chat, h_input["player_name"], handled)
+
+    def _finish_chat(self, event: "PlayerChatEvent | BreezeChatSnapshot | None", player_name: str, handled: BreezeExtensionAPI.HandlerOutput) -> None:
+        bus = self.bea.eventbus
+        if event is not None and bus.has_listeners("on_breeze_chat_processed"):
+            bus._emit("on_breeze_chat_processed", event, handled, handled["is_bad"], self)
+
+        if handled["is_bad"]:
+            self.metrics.count("censored")
         if handled["fully_cancel_message"]:
+            self.metrics.count("cancelled")
             return
-        self.server.broadcast_message(f"<{event.player.name}> {handled["finished_message"]}")
\ No newline at end of file
+        self.server.broadcast_message(f"<{player_name}> {handled["finished_message"]}")
\ No newline at end of file
@@ -2,6 +2,7 @@
 from ..types.types import ( #type: ignore
     PlayerData,
     PlayerDataManager,
+    RateLimiter,
     BreezeTextProcessing,
     BreezeExtensionAPI,
 )
@@ -9,6 +10,7 @@ from ..types.types import ( #type: ignore
 __all__ = [
     "PlayerData",
     "PlayerDataManager",
+    "RateLimiter",
     "BreezeTextProcessing",
     "BreezeExtensionAPI",
 ]
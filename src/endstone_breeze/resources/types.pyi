@@ -1,26 +1,146 @@
 # stub for extensions
 
-from typing import TypedDict, Callable, Any
+from collections import deque
+from typing import TypedDict, NamedTuple, NotRequired, Callable, Any
 from endstone import Logger, Player
 from endstone.event import PlayerChatEvent
 from endstone.plugin import Plugin
 
-class PlayerData(TypedDict):
-    """Player data structure for tracking message history and timing."""
+class RateLimitState:
+    """One player's token bucket and sliding window counters."""
+    tokens: float
+    refilled_at: float
+    window_start: float
+    window_count: int
+    previous_count: int
+
+class RateLimiter:
+    """Token bucket (burst messages at once, refilled at rate per second) plus a sliding window (window_max per window seconds)."""
+    rate: float
+    burst: float
+    window: float
+    window_max: int
+
+    def __init__(self, rate: float = 1.0, burst: float = 4, window: float = 10.0, window_max: int = 8) -> None: ...
+    def new_state(self, now: float | None = None) -> RateLimitState: ...
+    def allow(self, state: RateLimitState, now: float | None = None) -> bool:
+        """Whether one more message is allowed, counts it if it is."""
+        ...
+
+class PlayerData:
+    """Per-player data. Fields can be read and set as attributes or like a dict (data["last_message"])."""
     latest_time_a_message_was_sent: float
     last_message: str
+    rate_limit: RateLimitState
+    last_seen: float
+    split_node: int
+    split_at: float
+    split_version: int
+
+    def __getitem__(self, key: str) -> Any: ...
+    def __setitem__(self, key: str, value: Any) -> None: ...
+
+class Offence(NamedTuple):
+    time: float
+    """When it happened, time.time()."""
+    kind: str
+    """"profanity", "split", "raid", or whatever a custom handler recorded."""
+    message: str
+
+class OffenceHistory:
+    """A player's offences: counts over all time plus the latest few. Kept across reconnects and restarts."""
+    total: int
+    counts: dict[str, int]
+    """Offences per kind."""
+    recent: deque[Offence]
+    """The latest offences, oldest first."""
+    first_at: float
+    last_at: float
+    loaded: bool
+    """False until earlier sessions' offences have been read in (a moment after the player joins), only this session's are in it until then."""
 
 class PlayerDataManager:
-    """Manages player data including message timestamps and content."""
+    """Manages player data, keyed by the player's uuid (str(player.unique_id)). Thread-safe.
+
+    Records untouched for idle_timeout seconds are dropped, and there are never more than max_players of them.
+    Keying by player name is deprecated (a warning is logged once): those records aren't dropped when the player leaves."""
     player_data: dict[str, PlayerData]
+    rate_limiter: RateLimiter
+    idle_timeout: float
+    max_players: int
     
-    def __init__(self) -> None: ...
-    def update_player_data(self, name: str, message: str) -> None: ...
-    def get_player_data(self, name: str) -> PlayerData: ...
-    def remove_player_data(self, name: str) -> None: ...
+    def __init__(self, rate_limiter: RateLimiter | None = None, idle_timeout: float = 600.0, max_players: int = 10000, logger: Logger | None = None) -> None: ...
+    def update_player_data(self, player_id: str, message: str) -> None: ...
+    def get_player_data(self, player_id: str) -> PlayerData:
+        """The player's record, made if they don't have one yet."""
+        ...
+    def remove_player_data(self, player_id: str) -> None: ...
+    def reset_player_data(self, player_id: str) -> PlayerData: ...
+    def allow_message(self, player_id: str) -> bool:
+        """Whether the player is under the [rate_limit] limits. Counts the message if they are, so call it once per message, before checking it."""
+        ...
+    def get_offence_history(self, player_id: str) -> OffenceHistory:
+        """The player's offence history. Read from memory, cheap enough to call on every message."""
+        ...
+    def record_offence(self, player_id: str, kind: str, message: str = "") -> None:
+        """Counts an offence against the player. Written to disk in the background."""
+        ...
+    def evict_idle(self, now: float | None = None) -> int: ...
+
+class BreezeMetrics:
+    """Counters and latency histograms for the handler, each profanity layer and each extension event (what /breeze stats shows)."""
+    enabled: bool
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record how long a stage took. Extensions can time their own stages with this."""
+        ...
+    def count(self, counter: str, n: int = 1) -> None: ...
+    def add_gauge(self, name: str, gauge: Callable[[], dict[str, float]]) -> None:
+        """Show something else's stats (a cache's size and hit rate, say) in /breeze stats."""
+        ...
+    def snapshot(self) -> dict[str, Any]: ...
+
+class BreezeWordLists:
+    """Runtime edits to the blacklist, whitelist and longlist. Saved to word_lists.json in Breeze's data folder."""
+    LISTS: tuple[str, ...]
+    edits: dict[str, dict[str, set[str]]]
+    """What changed from the shipped lists, per list: {"added": {...}, "removed": {...}}."""
+
+    def add(self, list_name: str, words: list[str]) -> list[str]:
+        """Adds words to "blacklist", "whitelist" or "longlist", returns the ones that weren't in it already. Takes effect right away."""
+        ...
+    def remove(self, list_name: str, words: list[str]) -> list[str]:
+        """Removes words from a list, returns the ones that were in it."""
+        ...
+
+class NearDuplicate(NamedTuple):
+    players: int
+    """Different players that sent something like this in the raid window, the new message's sender included."""
+    matches: int
+    """Messages like this one in the window, not counting the new one."""
 
 class BreezeTextProcessing:
     """Handles text processing including profanity checking and censoring."""
+    metrics: BreezeMetrics
+    raid_min_players: int
+    cancel_raids: bool
+    """Whether the default handler cancels raids ([raid_detection] cancel), or only flags them."""
+    split_window: float
+    split_max_fragment: int
+
+    def check_raid(self, text: str, player_id: str) -> NearDuplicate | None:
+        """Adds the message to the raid detector's window and returns how many players recently sent something close to it.
+
+        None if raid detection is off or the message is too short to tell. Call it once per message."""
+        ...
+    def check_split(self, text: str, player_data: PlayerData) -> bool:
+        """Whether this message finishes a longlist word the player's last message(s) started ("fuc", then "k"). Off unless [split_words] is enabled.
+
+        The matcher state is kept in player_data between messages. Call it once per message, in order."""
+        ...
+    def is_raid(self, text: str, player_id: str) -> bool:
+        """Whether at least raid_min_players players are posting (near) this message. Adds it to the window like check_raid."""
+        ...
     
     def check_and_censor(
         self, 
@@ -40,14 +160,36 @@ class BreezeExtensionAPI:
     
     class _EventBus:
         """Internal event bus for extension hooks."""
-        def on(self, event_name: str, func: Callable[..., Any]) -> None: ...
+        def on(self, event_name: str, func: Callable[..., Any], wait: bool = False, timeout: float | None = None) -> None:
+            """Register a listener. Sync listeners run inline, async listeners run on Breeze's event loop.
+
+            wait blocks the emit until an async listener finishes (or timeout seconds pass), otherwise it's fire-and-forget."""
+            ...
+        def has_listeners(self, event_name: str) -> bool:
+            """Whether anything listens to the event."""
+            ...
+        def release(self, func: Callable[..., Any]) -> bool:
+            """Take a quarantined listener back in. Listeners that keep going over the time budget get quarantined."""
+            ...
+        def stats(self) -> dict[str, list[dict[str, Any]]]:
+            """Call counts, errors and latency of every listener, per event."""
+            ...
     
     class HandlerInput(TypedDict):
-        """Input data for message handlers."""
+        """Input data for message handlers. Read on the server thread, so a handler running on a chat worker never needs to touch the server."""
         message: str
-        player: Player
         chat_format: str
-        recipients: list[Player]
+        player_uuid: str
+        """The sender's uuid, str(player.unique_id). Player data is keyed by it."""
+        player_name: str
+        reply: Callable[[str], None]
+        """Sends the sender a message on the server thread (if they're still online). Safe to call from any thread."""
+        run_on_main: Callable[[Callable[[], None]], None]
+        """Runs a function on the server thread. Use it for any other server call when [moderation] workers > 0."""
+        player: NotRequired[Player]
+        """Only there when handlers run on the server thread ([moderation] workers = 0)."""
+        recipients: NotRequired[list[Player]]
+        """Only there when handlers run on the server thread ([moderation] workers = 0)."""
     
     class HandlerOutput(TypedDict):
         """Output data returned by message handlers."""
@@ -55,6 +197,12 @@ class BreezeExtensionAPI:
         fully_cancel_message: bool
         finished_message: str
         original_message: str
+        caught: NotRequired[list[str]]
+        """The layers that caught the message, for the moderation log."""
+        reason: NotRequired[str]
+        """Why the message was cancelled (or flagged), for the moderation log."""
+        log: NotRequired[bool]
+        """Put the message in the moderation log even if it wasn't bad or cancelled."""
     
     ready: bool
     logger: Logger
@@ -65,11 +213,22 @@ class BreezeExtensionAPI:
         self, 
         logger: Logger, 
         pdm: PlayerDataManager | None = None, 
-        btp: BreezeTextProcessing | None = None
+        btp: BreezeTextProcessing | None = None,
+        event_bus: _EventBus | None = None
     ) -> None: ...
     
     @property
     def eventbus(self) -> _EventBus: ...
+
+    @property
+    def word_lists(self) -> BreezeWordLists | None:
+        """Add and remove blacklist, whitelist and longlist words at runtime. None before the extension API is initialized."""
+        ...
+
+    @property
+    def moderation_mode(self) -> str:
+        """"full" when every check runs, "degraded" when Breeze is skipping profanity-check because chat is falling behind."""
+        ...
     
     def on_breeze_chat_event(
         self, 
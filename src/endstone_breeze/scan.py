@@ -0,0 +1,219 @@
+"""
+offline moderation for chat logs, runs every message through the same check_and_censor the plugin uses
+
+    breeze-scan chat.log --output results.jsonl
+    breeze-scan chat.csv --field message --output results.csv --only-bad --longlist my_longlist.txt
+
+(or python -m endstone_breeze.scan). the input is read in chunks and handed to a pool of worker processes,
+every worker loads the model and word lists once. results come out in input order, and only a few chunks
+are ever in memory at once, so logs can be as big as you like. needs endstone installed, like the plugin
+
+inputs (picked by extension, or --input-format):
+- text: one message per line
+- jsonl: one json object per line, the message is in --field
+- csv: with a header row, the message is in the --field column. one record per line (no line breaks inside fields)
+"""
+import argparse, csv, io, json, os, sys, time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Iterator, cast
+
+from .breeze import BreezeLoadShedder, BreezeTextProcessing, BreezeWordLists, pc, pe, pl
+from .utils.general_utils import LRUCache
+
+LAYERS = ("Profanity-check", "Extralist", "Longlist") # check_and_censor's names for them
+OUTPUT_FIELDS = ("line", "message", "finished_message", "is_bad", "caught")
+
+# per worker process, set up once by _init_worker
+_btp: BreezeTextProcessing | None = None
+_threads: ThreadPoolExecutor | None = None
+_options: dict = {}
+
+def _read_words(path: str) -> list[str]:
+    """one word per line, blank lines and # comments are skipped"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def _init_worker(options: dict) -> None:
+    global _btp, _threads, _options
+    _options = options
+    if options["longlist"]:
+        pl.set_words(_read_words(options["longlist"]))
+    if options["extralist"]:
+        pe.set_words(_read_words(options["extralist"]))
+    if options["word_lists"]:
+        BreezeWordLists(path=options["word_lists"]).load()
+    for layer, profanity_filter in zip(LAYERS, (pc, pe, pl)):
+        if options["checks"][layer]:
+            profanity_filter.warm_up()
+    # every layer always runs (nothing's waiting on a log), and logs repeat themselves a lot, same as live chat
+    _btp = BreezeTextProcessing(
+        load_shedder=BreezeLoadShedder(enabled=False),
+        verdict_cache=LRUCache(options["cache_size"]) if options["cache_size"] > 0 else None,
+    )
+    # messages checked side by side get their model calls batched together (PredictionBatcher), which is most of the speedup
+    _threads = ThreadPoolExecutor(max_workers=options["batch"])
+
+def _messages(lines: list[str], input_format: str, field: str, header: list[str] | None) -> Iterator[str | None]:
+    """the message on every line, None for lines that don't have one"""
+    if input_format == "text":
+        yield from lines
+    elif input_format == "jsonl":
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            message = record.get(field) if isinstance(record, dict) else None
+            yield message if isinstance(message, str) else None
+    else:
+        # a reader per line, so a broken row (a stray \r, an unclosed quote) can't eat or shift the lines after it
+        column = cast(list[str], header).index(field)
+        for line in lines:
+            try:
+                row = next(csv.reader((line,)), [])
+            except csv.Error:
+                yield None
+                continue
+            yield row[column] if column < len(row) else None
+
+def _scan_chunk(first_line: int, chunk: bytes) -> tuple[str, int, int]:
+    """runs in a worker, returns the formatted output lines, how many messages were checked and how many were bad"""
+    assert _btp is not None and _threads is not None
+    btp, options = _btp, _options
+    # split on \n only, like _chunks counts lines. splitlines() also breaks on \r, \x0c, \u2028 and co, which would cut
+    # messages in half and throw the line numbers off
+    text = chunk.decode("utf-8", errors="replace")
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+    checks = options["checks"]
+    messages = [(offset, message) for offset, message in enumerate(_messages(lines, options["input_format"], options["field"], options["header"])) if message]
+    verdicts = _threads.map(lambda item: btp.check_and_censor(item[1], checks), messages)
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n") if options["output_format"] == "csv" else None
+    checked = bad = 0
+    for (offset, message), (finished_message, is_bad, caught) in zip(messages, verdicts):
+        checked += 1
+        bad += is_bad
+        if options["only_bad"] and not is_bad:
+            continue
+
+        line = first_line + offset
+        if writer is not None:
+            writer.writerow((line, message, finished_message, is_bad, "|".join(caught)))
+        else:
+            record = {"line": line, "message": message, "finished_message": finished_message, "is_bad": is_bad, "caught": caught}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return out.getvalue(), checked, bad
+
+def _chunks(f: IO[bytes], chunk_size: int, first_line: int) -> Iterator[tuple[int, bytes]]:
+    """(first line number, whole lines) chunks of about chunk_size bytes"""
+    line = first_line
+    rest = b""
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            # no line break yet, keep reading
+            rest = data
+            continue
+        chunk, rest = data[:cut], data[cut:]
+        yield line, chunk
+        line += chunk.count(b"\n")
+    if rest:
+        yield line, rest
+
+def scan(args: argparse.Namespace, output: IO[str]) -> dict[str, float]:
+    input_format = args.input_format or {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv"}.get(args.input.suffix.lower(), "text")
+    output_format = args.output_format or ("csv" if args.output and args.output.suffix.lower() == ".csv" else "jsonl")
+    skipped = {layer.lower() for layer in args.skip}
+    options = {
+        "input_format": input_format,
+        "output_format": output_format,
+        "field": args.field,
+        "header": None,
+        "only_bad": args.only_bad,
+        "checks": {layer: layer.lower() not in skipped for layer in LAYERS},
+        "longlist": str(args.longlist) if args.longlist else None,
+        "extralist": str(args.extralist) if args.extralist else None,
+        "word_lists": str(args.word_lists) if args.word_lists else None,
+        "cache_size": args.cache_size,
+        "batch": args.batch,
+    }
+
+    started = time.perf_counter()
+    checked = bad = 0
+    with open(args.input, "rb") as f:
+        first_line = 1
+        if input_format == "csv":
+            header_line = f.readline().decode("utf-8-sig", errors="replace")
+            options["header"] = next(csv.reader([header_line]), [])
+            if args.field not in options["header"]:
+                raise SystemExit(f"breeze-scan: {args.input} has no {args.field!r} column")
+            first_line = 2
+        if output_format == "csv":
+            csv.writer(output, lineterminator="\n").writerow(OUTPUT_FIELDS)
+
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(options,)) as pool:
+            # a few chunks per worker in flight, so the file is never read much further ahead than it's checked
+            pending: deque[Future[tuple[str, int, int]]] = deque()
+            for line, chunk in _chunks(f, args.chunk_size, first_line):
+                pending.append(pool.submit(_scan_chunk, line, chunk))
+                if len(pending) >= args.workers * 2:
+                    text, n, b = pending.popleft().result()
+                    output.write(text)
+                    checked += n
+                    bad += b
+            while pending:
+                text, n, b = pending.popleft().result()
+                output.write(text)
+                checked += n
+                bad += b
+
+    elapsed = time.perf_counter() - started
+    return {"messages": checked, "bad": bad, "seconds": elapsed, "messages_per_second": checked / elapsed if elapsed else 0.0}
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="breeze-scan", description="run chat logs through Breeze's profanity filters")
+    parser.add_argument("input", type=Path, help="chat log to scan")
+    parser.add_argument("--output", type=Path, help="where to write the results (default stdout), .csv writes csv")
+    parser.add_argument("--input-format", choices=("text", "jsonl", "csv"), help="default: from the file extension, text otherwise")
+    parser.add_argument("--output-format", choices=("jsonl", "csv"), help="default: from --output's extension, jsonl otherwise")
+    parser.add_argument("--field", default="message", help="jsonl key / csv column holding the message (default message)")
+    parser.add_argument("--only-bad", action="store_true", help="only write messages that got caught")
+    parser.add_argument("--skip", action="append", default=[], choices=[layer.lower() for layer in LAYERS], type=str.lower, help="don't run this layer (repeatable)")
+    parser.add_argument("--longlist", type=Path, help="use this longlist instead (one word per line)")
+    parser.add_argument("--extralist", type=Path, help="use this extralist instead (one word per line)")
+    parser.add_argument("--word-lists", type=Path, help="apply the changes in a server's word_lists.json (from /breeze words) on top")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=1 << 18, help="bytes of log per chunk handed to a worker (default 256KiB)")
+    parser.add_argument("--batch", type=int, default=32, help="messages each worker checks at once, their model calls get batched (default 32)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="verdicts each worker remembers for repeated messages, 0 turns it off")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.chunk_size < 1 or args.batch < 1:
+        parser.error("--workers, --chunk-size and --batch have to be positive")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            stats = scan(args, output)
+    else:
+        stats = scan(args, sys.stdout)
+
+    print(
+        f"breeze-scan: {stats['messages']} messages, {stats['bad']} caught, "
+        f"{stats['seconds']:.1f}s ({stats['messages_per_second']:.0f} messages/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
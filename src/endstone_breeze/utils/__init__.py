@@ -3,12 +3,29 @@ from .profanity_utils import (
     ProfanityCheck,
     ProfanityExtralist,
     ProfanityLonglist,
+    PredictionBatcher,
+    set_cache_dir,
+)
+
+from .matching_utils import (
+    AhoCorasick,
+    FuzzyIndex,
+    MinHasher,
+    NearDuplicate,
+    NearDuplicateIndex,
 )
 
 from .general_utils import (
+    Token,
+    scan_tokens,
     split_into_tokens,
     to_hash_mask,
     levenshtein,
+    bounded_levenshtein,
+    LRUCache,
+    LatencyHistogram,
+    RateLimiter,
+    RateLimitState,
 )
 
 __all__ = [
@@ -17,9 +34,25 @@ __all__ = [
     "ProfanityCheck",
     "ProfanityExtralist",
     "ProfanityLonglist",
+    "PredictionBatcher",
+    "set_cache_dir",
+
+    # matching
+    "AhoCorasick",
+    "FuzzyIndex",
+    "MinHasher",
+    "NearDuplicate",
+    "NearDuplicateIndex",
 
     # general utils
+    "Token",
+    "scan_tokens",
     "split_into_tokens",
     "to_hash_mask",
     "levenshtein",
+    "bounded_levenshtein",
+    "LRUCache",
+    "LatencyHistogram",
+    "RateLimiter",
+    "RateLimitState",
 ]
@@ -1,29 +1,100 @@
-import re
+import re, threading, time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Generic, Hashable, Sequence, TypeVar
 
-def _normalize_token(token: str) -> str:
-    # Case 1: spaced-out letters (f>u>c>k, a.s.s)
-    if re.fullmatch(r"(?:[A-Za-z0-9][^\w\s]+)+[A-Za-z0-9]", token):
-        return re.sub(r"[^\w]", "", token).lower()
-    # Case 2: normal word
-    return token.lower()
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# one scanner for everything: words (letters/numbers with up to 2 symbols between them, like f*ck, sh!t, f>u>c>k),
+# runs of whitespace, and single punctuation characters. only words are in the named group
+_TOKEN_PATTERN = re.compile(r"(?P<word>[A-Za-z0-9](?:[^\w\s]{0,2}[A-Za-z0-9])*)|\s+|[^\w\s]")
+_SPACED_OUT = re.compile(r"(?:[A-Za-z0-9][^\w\s]+)+[A-Za-z0-9]")
+_NOT_WORD_CHAR = re.compile(r"[^\w]")
+
+# word characters that aren't ascii letters/numbers, no token pattern matches these
+_DROPPED_CHAR = re.compile(r"[^\WA-Za-z0-9]")
+
+TOKEN_WORD = 0
+TOKEN_SEPARATOR = 1
+
+def _normalize_word(word: str) -> str:
+    # plain word, by far the most common
+    if word.isalnum():
+        return word.lower()
+    # spaced-out letters (f>u>c>k, a.s.s)
+    if _SPACED_OUT.fullmatch(word):
+        return _NOT_WORD_CHAR.sub("", word).lower()
+    # word with symbols in it (f*ck)
+    return word.lower()
+
+class Token:
+    """
+    one token of a message
+
+    start and end are offsets into the scanned text (so text[start:end] is the token as it was typed),
+    text is the normalized token: words are lowercased with spaced-out letters joined, separators are kept as-is
+    """
+    __slots__ = ("start", "end", "kind", "text")
+
+    def __init__(self, start: int, end: int, kind: int, text: str):
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.text = text
+
+    @property
+    def is_word(self) -> bool:
+        return self.kind == TOKEN_WORD
+
+    def with_text(self, text: str) -> "Token":
+        """the same span with different normalized text"""
+        return Token(self.start, self.end, self.kind, text)
+
+    def __repr__(self) -> str:
+        kind = "word" if self.kind == TOKEN_WORD else "separator"
+        return f"Token({self.start}, {self.end}, {kind}, {self.text!r})"
+
+def scan_tokens(text: str) -> list[Token]:
+    """
+    Split text into tokens for profanity filtering, in a single pass:
+    - words (letters/numbers with optional embedded symbols, like f*ck, sh!t, f>u>c>k), normalized
+    - separators (spaces, punctuation, etc.), kept as-is
+    """
+    tokens = []
+    append = tokens.append
+    for m in _TOKEN_PATTERN.finditer(text):
+        start, end = m.span()
+        if m.lastgroup is not None:
+            append(Token(start, end, TOKEN_WORD, _normalize_word(m.group())))
+        else:
+            append(Token(start, end, TOKEN_SEPARATOR, m.group()))
+    return tokens
 
 def split_into_tokens(text: str) -> list[str]:
     """
     Split text into tokens for profanity filtering:
-    - words (letters/numbers with optional embedded symbols, like f*ck, sh!t, f>u>c>k)
+    - words (letters/numbers with optional non-space symbols inside, like f*ck, sh!t, f>u>c>k)
     - separators (spaces, punctuation, etc.)
+
+    same tokens as scan_tokens, just the text of them
     """
-    # Words: letters/numbers with optional non-space symbols inside
-    # Separators: whitespace or punctuation
-    raw_tokens = re.findall(r"[A-Za-z0-9](?:[^\w\s]{0,2}[A-Za-z0-9])*|\s+|[^\w\s]", text)
+    return [
+        _normalize_word(m.group()) if m.lastgroup is not None else m.group()
+        for m in _TOKEN_PATTERN.finditer(text)
+    ]
 
-    tokens = []
-    for t in raw_tokens:
-        if re.match(r"[A-Za-z0-9]", t):  # word-like
-            tokens.append(_normalize_token(t))
-        else:  # keep spaces/punctuation as-is
-            tokens.append(t)
-    return tokens
+def drops_characters(text: str) -> bool:
+    """
+    returns true if scan_tokens throws away some of the text's characters (non-ascii letters, underscores)
+
+    those are the only texts where splitting the joined tokens again can give different tokens, since words that were apart can end up glued together
+    """
+    return _DROPPED_CHAR.search(text) is not None
+
+def apply_censor_mask(tokens: Sequence[Token], mask: Sequence[bool], replacement: str = "#") -> str:
+    """join tokens back into text, replacing every character of the masked tokens with the replacement"""
+    return "".join((replacement * len(t.text)) if m else t.text for t, m in zip(tokens, mask))
 
 def to_hash_mask(text: str, whitelist: str = " .,!?;:'\"()-") -> str:
     """replace all non-whitelisted (punctuation and spaces) characters in the given text with a hash (#)"""
@@ -48,11 +119,200 @@ def levenshtein(a: str, b: str) -> int:
         prev_row = curr_row
     return prev_row[-1]
 
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    """
+    compute Levenshtein edit distance between two strings, but give up as soon as it's guaranteed to be over max_dist
+
+    returns the exact distance if it's <= max_dist, otherwise max_dist + 1
+    """
+    if len(a) < len(b):
+        a, b = b, a
+
+    # the distance is always at least the length difference
+    if len(a) - len(b) > max_dist:
+        return max_dist + 1
+
+    if len(b) == 0:
+        return len(a)
+
+    prev_row = list(range(len(b) + 1))
+    for i, c1 in enumerate(a):
+        curr_row = [i + 1]
+        row_min = i + 1
+        for j, c2 in enumerate(b):
+            dist = min(prev_row[j + 1] + 1, curr_row[j] + 1, prev_row[j] + (c1 != c2))
+            curr_row.append(dist)
+            if dist < row_min:
+                row_min = dist
+        # rows never get a smaller minimum than the one before, so this row decides it
+        if row_min > max_dist:
+            return max_dist + 1
+        prev_row = curr_row
+    return prev_row[-1] if prev_row[-1] <= max_dist else max_dist + 1
+
 def count_words(text: str) -> int:
     """
     counts words in a string. words are sequences of letters/numbers
     separated by spaces or punctuation
     """
-    tokens = split_into_tokens(text)
-    words = [t for t in tokens if t and t.isalnum()]
-    return len(words)
\ No newline at end of file
+    return sum(1 for t in scan_tokens(text) if t.kind == TOKEN_WORD and t.text.isalnum())
+
+class LRUCache(Generic[K, V]):
+    """
+    small thread-safe least-recently-used cache with hit/miss counters
+
+    once it holds maxsize entries, adding one more throws out the one that was used longest ago.
+    with a ttl, entries also expire ttl seconds after they were put in
+    """
+    def __init__(self, maxsize: int = 4096, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict() # key -> (value, expiry)
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LatencyHistogram:
+    """
+    fixed-bucket latency histogram. recording is a bisect and a few additions, nothing gets allocated per sample
+
+    bucket bounds are upper bounds in seconds, anything slower than the last one lands in an extra overflow bucket
+    """
+    BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = BOUNDS):
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """upper bound of the bucket the p-th percentile (0-100) falls in, capped at the slowest sample seen"""
+        if self.count == 0:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        """summary in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+class RateLimitState:
+    """one player's rate limit state. always the same five numbers, however much they send"""
+    __slots__ = ("tokens", "refilled_at", "window_start", "window_count", "previous_count")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.refilled_at = now
+        self.window_start = now
+        self.window_count = 0
+        self.previous_count = 0
+
+class RateLimiter:
+    """
+    token bucket plus sliding window, a message has to get past both
+
+    the bucket holds up to burst tokens and refills at rate per second, so short bursts are fine but a steady flood isn't.
+    the window allows at most window_max messages in any window seconds (approximated from this window's and the
+    previous window's counts, so the state stays O(1)), which catches floods paced just under the refill rate.
+    only allowed messages use up tokens and count towards the window
+    """
+    def __init__(self, rate: float = 1.0, burst: float = 4, window: float = 10.0, window_max: int = 8):
+        self.rate = rate
+        self.burst = burst
+        self.window = window
+        self.window_max = window_max
+
+    def new_state(self, now: float | None = None) -> RateLimitState:
+        return RateLimitState(self.burst, time.monotonic() if now is None else now)
+
+    def allow(self, state: RateLimitState, now: float | None = None) -> bool:
+        """whether one more message is allowed right now, and if it is, counts it"""
+        now = time.monotonic() if now is None else now
+
+        # token bucket
+        tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+        state.refilled_at = now
+
+        # sliding window, roll over to the window now is in
+        elapsed = now - state.window_start
+        if elapsed >= self.window:
+            windows = int(elapsed // self.window)
+            state.previous_count = state.window_count if windows == 1 else 0
+            state.window_count = 0
+            state.window_start += windows * self.window
+            elapsed -= windows * self.window
+        # the previous window's messages count for the part of it still inside the last window seconds
+        estimate = state.previous_count * (1 - elapsed / self.window) + state.window_count
+
+        if tokens < 1 or estimate + 1 > self.window_max:
+            state.tokens = tokens
+            return False
+
+        state.tokens = tokens - 1
+        state.window_count += 1
+        return True
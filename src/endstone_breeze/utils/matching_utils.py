@@ -0,0 +1,410 @@
+"""
+matching utilities, compiled structures the profanity filters use so they don't have to brute-force every word list on every message.
+
+AhoCorasick
+a multi-pattern automaton. it's built once from a word list and then finds every occurrence of every word in a single pass over the text.
+
+FuzzyIndex
+a fuzzy word matcher. words are bucketed by length so a token is only compared with the words it could possibly be close to,
+and every comparison is a bounded edit distance that bails out as soon as the threshold is passed.
+
+NearDuplicateIndex
+a rolling window of minhash signatures. finds recent messages that are almost the same as a new one (raids posting
+slight variations of one ad from many accounts) without keeping the messages themselves.
+"""
+import re, threading, time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, NamedTuple
+
+from .general_utils import bounded_levenshtein
+
+if TYPE_CHECKING:
+    # only the minhash code needs numpy, and it imports it itself. the wheel build imports this module without numpy around
+    import numpy as np
+
+class AhoCorasick:
+    """
+    multi-pattern substring matcher (Aho-Corasick automaton)
+
+    patterns can be added at any time with add(), the failure links get recomputed lazily on the next search, which is just one pass over the trie.
+    removing a pattern rebuilds the trie from the remaining patterns.
+    """
+    __slots__ = ("_goto", "_fail", "_own", "_out", "_patterns", "_dirty")
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._patterns: set[str] = set()
+        self._reset()
+        for pattern in patterns:
+            self.add(pattern)
+
+    def _reset(self) -> None:
+        self._goto: list[dict[str, int]] = [{}] # node -> {char: next node}
+        self._fail: list[int] = [0]
+        self._own: list[tuple[int, ...]] = [()] # lengths of the patterns ending exactly at this node
+        self._out: list[tuple[int, ...]] = [()] # own + everything reachable through failure links
+        self._dirty = False
+
+    def _insert(self, pattern: str) -> None:
+        goto = self._goto
+        node = 0
+        for ch in pattern:
+            nxt = goto[node].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[node][ch] = nxt
+                goto.append({})
+                self._fail.append(0)
+                self._own.append(())
+                self._out.append(())
+            node = nxt
+        self._own[node] += (len(pattern),)
+
+    def _compile(self) -> None:
+        """(re)compute failure links and merged outputs with a BFS over the trie"""
+        goto, fail, own, out = self._goto, self._fail, self._own, self._out
+
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            out[child] = own[child]
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[child] = f
+                out[child] = own[child] + out[f]
+                queue.append(child)
+
+        self._dirty = False
+
+    def compile(self) -> None:
+        """compute the failure links now, instead of on the next search"""
+        if self._dirty:
+            self._compile()
+
+    def add(self, pattern: str) -> None:
+        """add a pattern, empty strings and duplicates are ignored"""
+        if not pattern or pattern in self._patterns:
+            return
+        self._patterns.add(pattern)
+        self._insert(pattern)
+        self._dirty = True
+
+    def remove(self, pattern: str) -> None:
+        """remove a pattern, does nothing if it isn't in the automaton"""
+        if pattern not in self._patterns:
+            return
+        self._patterns.discard(pattern)
+        self._reset()
+        for p in self._patterns:
+            self._insert(p)
+        self._dirty = True
+
+    def iter_matches(self, text: str, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+        """
+        yields a (start, end) span for every pattern occurrence in text[start:end], overlapping ones included
+
+        spans are offsets into text, so text[s:e] is the matched pattern
+        """
+        if self._dirty:
+            self._compile()
+        goto, fail, out = self._goto, self._fail, self._out
+
+        node = 0
+        for i in range(start, len(text) if end is None else end):
+            ch = text[i]
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length in out[node]:
+                yield (i + 1 - length, i + 1)
+
+    def advance(self, node: int, text: str, start: int = 0, end: int | None = None) -> tuple[int, list[tuple[int, int]]]:
+        """
+        iter_matches, but carrying on from a state an earlier call ended in instead of the root
+
+        returns the state to carry on from next time and every match ending in text[start:end].
+        a match that began before start (in text the earlier calls saw) has a start before start, negative even.
+        states are only good until the automaton changes (add/remove)
+        """
+        if self._dirty:
+            self._compile()
+        goto, fail, out = self._goto, self._fail, self._out
+
+        spans = []
+        for i in range(start, len(text) if end is None else end):
+            ch = text[i]
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length in out[node]:
+                spans.append((i + 1 - length, i + 1))
+        return node, spans
+
+    def search(self, text: str, start: int = 0, end: int | None = None) -> bool:
+        """returns true if any pattern occurs in text[start:end]"""
+        for _ in self.iter_matches(text, start, end):
+            return True
+        return False
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._patterns
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+
+class FuzzyIndex:
+    """
+    fuzzy matcher over a word list, matches a token if either:
+
+    1. the whole token is within threshold(len(word)) edits of a word
+    2. the token is at most chunk_slack characters longer than a word, and some len(word) long chunk of it is within chunk_threshold(len(word)) edits of that word
+
+    the length of a token rules out most words before any edit distance is computed (edit distance is at least the length difference),
+    and verdicts are memoized since chat reuses the same tokens constantly
+
+    words can be added and removed while other threads are matching, an edit rebuilds just one length bucket
+    and swaps the new buckets in all at once
+    """
+    def __init__(
+        self,
+        words: Iterable[str] = (),
+        threshold: Callable[[int], int] = lambda n: n // 2,
+        chunk_threshold: Callable[[int], int] | None = None,
+        chunk_slack: int = 5,
+        memo_size: int = 4096,
+    ):
+        self.threshold = threshold
+        self.chunk_threshold = chunk_threshold
+        self.chunk_slack = chunk_slack
+        self.memo_size = memo_size
+        self._edit_lock = threading.Lock() # only edits take it, matching never does
+        self.set_words(words)
+
+    def set_words(self, words: Iterable[str]) -> None:
+        """replaces the word list and rebuilds the length buckets"""
+        buckets: dict[int, set[str]] = {}
+        for word in words:
+            if word:
+                buckets.setdefault(len(word), set()).add(word)
+        with self._edit_lock:
+            self._publish({length: self._bucket(length, bucket) for length, bucket in buckets.items()})
+
+    def _bucket(self, length: int, words: Iterable[str]) -> tuple[int, int, int, tuple[str, ...]]:
+        # (length, word threshold, chunk threshold, words)
+        return (
+            length,
+            self.threshold(length),
+            self.chunk_threshold(length) if self.chunk_threshold is not None else -1,
+            tuple(sorted(words)),
+        )
+
+    def _publish(self, buckets: dict[int, tuple[int, int, int, tuple[str, ...]]]) -> None:
+        # buckets sorted by length and a fresh memo, swapped in as one reference so match() never needs a lock
+        self._state = (tuple(buckets[length] for length in sorted(buckets)), {})
+
+    def _edit(self, word: str, add: bool) -> bool:
+        length = len(word)
+        with self._edit_lock:
+            buckets = {bucket[0]: bucket for bucket in self._state[0]}
+            words = set(buckets[length][3]) if length in buckets else set()
+            if (word in words) == add:
+                return False
+            if add:
+                words.add(word)
+            else:
+                words.discard(word)
+            # only the word's own length bucket is rebuilt
+            if words:
+                buckets[length] = self._bucket(length, words)
+            else:
+                del buckets[length]
+            self._publish(buckets)
+            return True
+
+    def add(self, word: str) -> bool:
+        """adds a word, returns false if it was already there"""
+        return bool(word) and self._edit(word, True)
+
+    def remove(self, word: str) -> bool:
+        """removes a word, returns false if it wasn't there"""
+        return bool(word) and self._edit(word, False)
+
+    def _match(self, buckets: tuple[tuple[int, int, int, tuple[str, ...]], ...], token: str) -> bool:
+        n = len(token)
+        for length, word_max, chunk_max, words in buckets:
+            # rule 1: whole token
+            if abs(n - length) <= word_max:
+                for word in words:
+                    if bounded_levenshtein(token, word, word_max) <= word_max:
+                        return True
+
+            # rule 2: chunks of the token
+            if chunk_max >= 0 and length <= n <= length + self.chunk_slack:
+                chunks = {token[j:j + length] for j in range(0, n - length + 1)}
+                for word in words:
+                    for chunk in chunks:
+                        if bounded_levenshtein(chunk, word, chunk_max) <= chunk_max:
+                            return True
+        return False
+
+    def match(self, token: str) -> bool:
+        """returns true if the token fuzzy-matches any word in the index"""
+        # one read of the state, so an edit landing halfway through can't mix old buckets with the new memo
+        buckets, memo = self._state
+        verdict = memo.get(token)
+        if verdict is None:
+            verdict = self._match(buckets, token)
+            if len(memo) >= self.memo_size:
+                memo.clear()
+            memo[token] = verdict
+        return verdict
+
+    def __contains__(self, word: str) -> bool:
+        return any(word in words for length, _, _, words in self._state[0] if length == len(word))
+
+    def __len__(self) -> int:
+        return sum(len(words) for *_, words in self._state[0])
+
+_NOT_ALNUM = re.compile(r"[^a-z0-9]+")
+_MASK64 = (1 << 64) - 1
+
+def squeeze(text: str) -> str:
+    """lowercase letters and numbers only, so spacing and punctuation tricks don't make messages look different"""
+    return _NOT_ALNUM.sub("", text.lower())
+
+class MinHasher:
+    """
+    minhash signatures of a text's character shingles
+
+    the share of positions two signatures agree on estimates the jaccard similarity of the two shingle sets.
+    every position is a multiply-shift hash of python's string hash, so signatures only mean something within one process
+    """
+    def __init__(self, num_hashes: int = 32, shingle: int = 4, seed: int = 0x5EED):
+        self.num_hashes = num_hashes
+        self.shingle = shingle
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        # odd multipliers, column vectors so every shingle hash goes through every hash function in one go
+        self._a = (rng.integers(0, 1 << 63, num_hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)).reshape(-1, 1)
+        self._b = rng.integers(0, 1 << 63, num_hashes, dtype=np.uint64).reshape(-1, 1)
+
+    def signature(self, squeezed: str) -> "np.ndarray":
+        import numpy as np
+        n = self.shingle
+        if len(squeezed) <= n:
+            shingles = {squeezed}
+        else:
+            shingles = {squeezed[i:i + n] for i in range(len(squeezed) - n + 1)}
+        hashes = np.fromiter((hash(s) & _MASK64 for s in shingles), dtype=np.uint64, count=len(shingles))
+        # uint64 wraps around, which is what multiply-shift hashing wants
+        return ((self._a * hashes + self._b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+class NearDuplicate(NamedTuple):
+    players: int # different senders of messages like this one in the window, the new one included
+    matches: int # messages like this one in the window, not counting the new one
+
+class _Entry(NamedTuple):
+    time: float
+    signature: "np.ndarray"
+    sender: str
+    keys: tuple[bytes, ...]
+
+class NearDuplicateIndex:
+    """
+    near-duplicate detector over the last window seconds of messages, only minhash signatures are kept
+
+    signatures are cut into bands, and a new message is only compared with the messages it shares a band with.
+    the defaults (20 bands of 3 rows) are tuned for min_similarity 0.5: messages with a jaccard similarity of 0.5 share a band
+    about 93% of the time (0.6: 99%, 0.3: 42%, unrelated ones almost never), and then at least min_similarity of the 60 positions have to agree.
+    bots posting their own edited copy of one ad are only 0.5-0.6 alike with each other (2-3 typos each in a 60 character ad),
+    python -m benchmarks.raids replays that. old signatures fall out of the window in the order they came in. thread-safe
+    """
+    def __init__(
+        self,
+        window: float = 60.0,
+        min_similarity: float = 0.5,
+        bands: int = 20,
+        rows: int = 3,
+        shingle: int = 4,
+        min_length: int = 12,
+        max_bucket: int = 64,
+    ):
+        self.window = window
+        self.min_similarity = min_similarity
+        self.min_length = min_length # messages shorter than this (squeezed) are never near-duplicates, "gg" from everyone isn't a raid
+        self.max_bucket = max_bucket # most messages kept per band value, the oldest go first
+        self.hasher = MinHasher(bands * rows, shingle)
+        self._bands = bands
+        self._rows = rows
+        self._entries: deque[_Entry] = deque()
+        self._buckets: dict[bytes, deque[_Entry]] = {} # band number + band values -> entries, oldest first
+        self._lock = threading.Lock()
+
+    def _keys(self, signature: "np.ndarray") -> tuple[bytes, ...]:
+        raw = signature.tobytes()
+        width = self._rows * signature.itemsize
+        return tuple(bytes((band,)) + raw[band * width:(band + 1) * width] for band in range(self._bands))
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        entries, buckets = self._entries, self._buckets
+        while entries and entries[0].time < cutoff:
+            entry = entries.popleft()
+            for key in entry.keys:
+                bucket = buckets.get(key)
+                # a full bucket may have dropped it already
+                if bucket and bucket[0] is entry:
+                    bucket.popleft()
+                    if not bucket:
+                        del buckets[key]
+
+    def check(self, text: str, sender: str, now: float | None = None) -> NearDuplicate | None:
+        """adds the message to the window, and returns how many players recently sent something close to it. None if it's too short to tell"""
+        squeezed = squeeze(text)
+        if len(squeezed) < self.min_length:
+            return None
+        signature = self.hasher.signature(squeezed)
+        keys = self._keys(signature)
+        entry = _Entry(time.monotonic() if now is None else now, signature, sender, keys)
+        needed = self.min_similarity * len(signature)
+
+        with self._lock:
+            self._expire(entry.time)
+
+            seen: set[int] = set()
+            senders = {sender}
+            matches = 0
+            for key in keys:
+                for other in self._buckets.get(key, ()):
+                    if id(other) in seen:
+                        continue
+                    seen.add(id(other))
+                    if (other.signature == signature).sum() >= needed:
+                        matches += 1
+                        senders.add(other.sender)
+
+            self._entries.append(entry)
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = deque()
+                elif len(bucket) >= self.max_bucket:
+                    bucket.popleft()
+                bucket.append(entry)
+
+        return NearDuplicate(len(senders), matches)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -8,42 +8,275 @@ utilizes a library (https://pypi.org/project/profanity-check/). this is the best
 this is a small list of bad words that the profanity-check library misses, like "shlt".
 this isn't recommended as a primary way to detect profanity, but is a good extra layer.
 this is very sensitive, and may catch things that are not bad words. if you find another word that should be added to the whitelist, tell me!!!
+the blacklist is kept in a FuzzyIndex, so a token is only compared against words close to its length, with an edit distance that stops early.
+the blacklist and whitelist can be edited while chat is being checked (add_words, add_whitelisted...).
 
 3. ProfanityLonglist
 this is a large list of bad words, and is very sensitive. it will catch any word that contains a bad word as a substring.
 this is NOT recommended as a primary way to detect profanity, but is a good extra layer.
 this is very sensitive, and may catch things that are not bad words. if you find another word that should be added to the longlist, tell me!!!
 this list is taken directly from Minecraft's banned words list, and is base64 encoded.
-this is likely the cheapest method
+this is likely the cheapest method, all the words are compiled into one Aho-Corasick automaton so a message is scanned once no matter how long the list gets
+words added at runtime go into a small second automaton and removed ones are skipped, until enough edits pile up to fold them into a new one
 
 the recommended way to use this is to first check with the profanity-check library, then the extralist (and maybe the longlist)
+model calls go through a PredictionBatcher, so messages being checked at the same time (from different threads) share one predict call
 """
-from profanity_check import predict, predict_prob 
-from .general_utils import split_into_tokens, levenshtein
-import base64
-from wordfreq import top_n_list
+from .general_utils import Token, TOKEN_WORD, scan_tokens, apply_censor_mask, LRUCache
+from .matching_utils import AhoCorasick, FuzzyIndex
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence, cast
+from pathlib import Path
+import base64, hashlib, os, pickle, re, threading, time
 
 from .words import blacklist
 from .words import whitelist
 from .words import longlist as unlonglisted # base64 encoded swear words
-_longlist = [
-    w.strip().lower()
-    for w in base64.b64decode(unlonglisted).decode("utf-8", errors="ignore").splitlines()
-    if w.strip()
-]
 
-english_words_list = set(top_n_list("en", 10000)) # Yes, this WILL have the curse words too, but this is only for Extralist and you will be layering Extralist on top of other filters
+# everything expensive (the model, wordfreq's list, decoding the longlist) is loaded the first time it's needed, not on import.
+# the derived word structures come precompiled in the wheel (resources/filters.pickle, made by hatch_build.py),
+# falling back to a copy built at runtime and cached on disk (see set_cache_dir). both are keyed by a hash of what they're built from
+_CACHE_VERSION = 1
+ARTIFACT_NAME = "filters.pickle"
+_shipped_artifact = Path(__file__).resolve().parent.parent / "resources" / ARTIFACT_NAME
+_cache_dir: Path | None = None
+_derived: dict[str, Any] | None = None
+_derived_lock = threading.Lock()
+
+_model_predict: Callable[[list[str]], Sequence[Any]] | None = None
+_model_lock = threading.Lock()
+
+def set_cache_dir(path: str | os.PathLike | None) -> None:
+    """where to keep the precompiled word structures between starts (None to not cache)"""
+    global _cache_dir
+    _cache_dir = Path(path) if path is not None else None
+
+def _source_hash() -> str:
+    from importlib.metadata import version
+
+    h = hashlib.sha256()
+    h.update(f"{_CACHE_VERSION}:{version('wordfreq')}".encode())
+    h.update(unlonglisted.encode())
+    h.update("\n".join(sorted(blacklist)).encode())
+    h.update("\n".join(sorted(whitelist)).encode())
+    return h.hexdigest()
+
+def _build_derived(source_hash: str) -> dict[str, Any]:
+    from wordfreq import top_n_list
+
+    longlist_words = [
+        w.strip().lower()
+        for w in base64.b64decode(unlonglisted).decode("utf-8", errors="ignore").splitlines()
+        if w.strip()
+    ]
+    longlist_automaton = AhoCorasick(longlist_words)
+    longlist_automaton.compile()
+    return {
+        "hash": source_hash,
+        "longlist": longlist_words,
+        "longlist_automaton": longlist_automaton,
+        "english_words": frozenset(top_n_list("en", 10000)), # Yes, this WILL have the curse words too, but this is only for Extralist and you will be layering Extralist on top of other filters
+    }
+
+def _read_artifact(path: Path, source_hash: str) -> dict[str, Any] | None:
+    """one read and one unpickle, None if it's missing, unreadable or built from different lists"""
+    try:
+        data = pickle.loads(path.read_bytes())
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("hash") != source_hash:
+        return None
+    return data
+
+def _write_artifact(path: Path, data: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix(".tmp")
+    tmp_file.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp_file, path)
+
+def build_artifact(path: str | os.PathLike) -> None:
+    """builds the precompiled word structures into path, this is what the wheel build runs"""
+    _write_artifact(Path(path), _build_derived(_source_hash()))
+
+def _load_derived() -> dict[str, Any]:
+    source_hash = _source_hash()
+
+    data = _read_artifact(_shipped_artifact, source_hash)
+    if data is not None:
+        return data
+
+    cache_file = _cache_dir / ARTIFACT_NAME if _cache_dir is not None else None
+    if cache_file is not None:
+        data = _read_artifact(cache_file, source_hash)
+        if data is not None:
+            return data
+
+    # not shipped (running from source) or wordfreq was updated since the wheel was built
+    data = _build_derived(source_hash)
+    if cache_file is not None:
+        try:
+            _write_artifact(cache_file, data)
+        except OSError:
+            pass
+    return data
+
+def derived_data() -> dict[str, Any]:
+    """the decoded longlist, its automaton and the english word set, loaded (or built) once"""
+    global _derived
+    if _derived is None:
+        with _derived_lock:
+            if _derived is None:
+                _derived = _load_derived()
+    return _derived
+
+def _predict(texts: list[str]) -> Sequence[Any]:
+    """profanity_check.predict, the model only gets loaded on the first call"""
+    global _model_predict
+    if _model_predict is None:
+        with _model_lock:
+            if _model_predict is None:
+                from profanity_check import predict
+                _model_predict = predict
+    return _model_predict(texts)
+
+def __getattr__(name: str) -> Any:
+    # the old module-level lists, built on first access now
+    if name == "_longlist":
+        return derived_data()["longlist"]
+    if name == "english_words_list":
+        return derived_data()["english_words"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class ProfanityFilter:
+    """
+    base class for the profanity layers
+
+    every layer works on the tokens from scan_tokens, so a message can be tokenized once and shared between layers (see BreezeTextProcessing.check_and_censor).
+    is_profane() and censor() are the single-message shortcuts that tokenize for you.
+    version goes up every time the layer's words (or model) change, so anything caching its verdicts knows when to throw them out.
+    """
+    version = 0
+
     def is_profane(self, text: str) -> bool:
-        raise NotImplementedError
+        return self.is_profane_tokens(scan_tokens(text))
 
     def censor(self, text: str, replacement: str = "#") -> str:
+        tokens = self.normalize_tokens(scan_tokens(text))
+        mask = self.censor_mask(tokens, [False] * len(tokens), replacement)
+        return apply_censor_mask(tokens, mask, replacement)
+
+    def is_profane_tokens(self, tokens: list[Token]) -> bool:
+        """same as is_profane, but on already scanned tokens"""
         raise NotImplementedError
 
+    def censor_mask(self, tokens: list[Token], censored: list[bool], replacement: str = "#", **kwargs) -> list[bool]:
+        """
+        works out which tokens this layer would censor
+
+        Args:
+            tokens (list[Token]): tokens from scan_tokens
+            censored (list[bool]): tokens that were already censored by an earlier layer, these count as separators (like the #'s they turn into)
+            replacement (str, optional): the censoring character
+
+        Returns:
+            list[bool]: true for every token this layer censors
+        """
+        raise NotImplementedError
+
+    def normalize_tokens(self, tokens: list[Token]) -> list[Token]:
+        """the tokens as this layer outputs them when censoring, unchanged by default"""
+        return tokens
+
+    def warm_up(self) -> None:
+        """loads whatever this layer loads lazily, cheap once it's loaded"""
+        pass
+
 
 # extralist
+def _extralist_word_threshold(length: int) -> int:
+    # rule 1: fuzzy match full word
+    return int(max(1, length // 1.3))
+
+def _extralist_chunk_threshold(length: int) -> int:
+    # rule 2: substring fuzzy match if lengths are close
+    return max(1, length // 2)
+
 class ProfanityExtralist(ProfanityFilter):
+    def __init__(self, words: Iterable[str] | None = None):
+        """
+        Args:
+            words (Iterable[str], optional): the bad words to fuzzy-match. defaults to the blacklist from words.py
+        """
+        self.index = FuzzyIndex(
+            threshold=_extralist_word_threshold,
+            chunk_threshold=_extralist_chunk_threshold,
+            chunk_slack=5,
+        )
+        self.whitelist: frozenset[str] = frozenset(whitelist) # never fuzzy-matched. swapped, never changed in place, so lookups don't need a lock
+        self._edit_lock = threading.Lock()
+        self.set_words(blacklist if words is None else words)
+
+    def set_words(self, words: Iterable[str]) -> None:
+        """replaces the blacklist and rebuilds the fuzzy index"""
+        with self._edit_lock:
+            self.words = frozenset(words)
+            self.index.set_words(self.words)
+            self.version += 1
+
+    def _edit_blacklist(self, words: Iterable[str], add: bool) -> list[str]:
+        changed = []
+        with self._edit_lock:
+            for word in dict.fromkeys(w.strip().lower() for w in words if w.strip()):
+                # the index only rebuilds the word's length bucket
+                if self.index.add(word) if add else self.index.remove(word):
+                    changed.append(word)
+            if changed:
+                self.words = self.words | set(changed) if add else self.words - set(changed)
+                self.version += 1
+        return changed
+
+    def add_words(self, words: Iterable[str]) -> list[str]:
+        """adds words to the blacklist while chat keeps being checked, returns the ones that weren't in it yet"""
+        return self._edit_blacklist(words, True)
+
+    def remove_words(self, words: Iterable[str]) -> list[str]:
+        """removes words from the blacklist while chat keeps being checked, returns the ones that were in it"""
+        return self._edit_blacklist(words, False)
+
+    def _edit_whitelist(self, words: Iterable[str], add: bool) -> list[str]:
+        with self._edit_lock:
+            changed = [w for w in dict.fromkeys(w.strip().lower() for w in words if w.strip()) if (w in self.whitelist) != add]
+            if changed:
+                self.whitelist = self.whitelist | set(changed) if add else self.whitelist - set(changed)
+                self.version += 1
+        return changed
+
+    def add_whitelisted(self, words: Iterable[str]) -> list[str]:
+        """adds words to the whitelist, returns the ones that weren't in it yet"""
+        return self._edit_whitelist(words, True)
+
+    def remove_whitelisted(self, words: Iterable[str]) -> list[str]:
+        """removes words from the whitelist, returns the ones that were in it"""
+        return self._edit_whitelist(words, False)
+
+    @property
+    def english_words(self) -> frozenset[str]:
+        """common english words, these are never fuzzy-matched"""
+        english_words = self.__dict__.get("_english_words")
+        if english_words is None:
+            english_words = self._english_words = derived_data()["english_words"]
+        return english_words
+
+    def warm_up(self) -> None:
+        """loads everything this layer needs now instead of on the first message"""
+        self.english_words
+
+    def _is_bad_token(self, token_lower: str) -> bool:
+        if token_lower in self.whitelist:
+            return False
+        elif token_lower in self.english_words:
+            return False
+        return self.index.match(token_lower)
+
     def is_profane(self, text: str) -> bool:
         """
         checks a string if it has any word found in the extra blacklist in words.py
@@ -53,28 +286,13 @@ class ProfanityExtralist(ProfanityFilter):
         Args:
             text (str): input string to check.
         """
-        tokens = split_into_tokens(text); tokens = [t.lower() for t in tokens] # split into words + separators
+        return self.is_profane_tokens(scan_tokens(text)) # split into words + separators
 
+    def is_profane_tokens(self, tokens: list[Token]) -> bool:
         for token in tokens:
-            token_lower = token.lower()
-            if token_lower in whitelist:
-                continue
-            elif token_lower in english_words_list:
-                continue
-
-            for bad in blacklist:
-                # Rule 1: fuzzy match full word
-                dist = levenshtein(token_lower, bad)
-                if dist <= max(1, len(bad) // 1.3):
-                    return True
-
-                # Rule 2: substring fuzzy match if lengths are close
-                if abs(len(token_lower) - len(bad)) <= 5:
-                    for j in range(0, len(token_lower) - len(bad) + 1):
-                        chunk = token_lower[j:j+len(bad)]
-                        dist = levenshtein(chunk, bad)
-                        if dist <= max(1, len(bad) // 2):
-                            return True
+            # words are already lowered by the tokenizer
+            if self._is_bad_token(token.text if token.kind == TOKEN_WORD else token.text.lower()):
+                return True
 
         return False
 
@@ -92,54 +310,239 @@ class ProfanityExtralist(ProfanityFilter):
         Returns:
             str: the censored text
         """
-        tokens = split_into_tokens(text)
-        lowered = [t.lower() for t in tokens]
+        tokens = scan_tokens(text)
+        mask = self.censor_mask(tokens, [False] * len(tokens), replacement, neighbors=neighbors)
+        return apply_censor_mask(tokens, mask, replacement)
+
+    def censor_mask(self, tokens: list[Token], censored: list[bool], replacement: str = "#", neighbors: int = 1) -> list[bool]:
         n = len(tokens)
-        censored = [False] * n
+        # separators are never alphanumeric, so only (lowered) word tokens count
+        is_word = [t.kind == TOKEN_WORD and t.text.isalnum() and not c for t, c in zip(tokens, censored)]
+        mask = [False] * n
 
-        for i, token in enumerate(tokens):
-            if token.isalnum() and self.is_profane(token):
-                censored[i] = True
+        for i in range(n):
+            # tokens are already normalized, so checking the token is the same as is_profane(token)
+            if is_word[i] and self._is_bad_token(tokens[i].text):
+                mask[i] = True
 
                 # neighbor logic
                 j, words_seen = i, 0
                 while j > 0 and words_seen < neighbors:
                     j -= 1
-                    if lowered[j].isalnum():
-                        censored[j] = True
+                    if is_word[j]:
+                        mask[j] = True
                         words_seen += 1
 
                 j, words_seen = i, 0
                 while j < n - 1 and words_seen < neighbors:
                     j += 1
-                    if lowered[j].isalnum():
-                        censored[j] = True
+                    if is_word[j]:
+                        mask[j] = True
                         words_seen += 1
 
-        # Build censored output
-        censored_tokens = [
-            (replacement * len(t)) if censored[i] and lowered[i].isalnum() else t
-            for i, t in enumerate(tokens)
-        ]
-
-        return "".join(censored_tokens)
+        return mask
 
 
 # longlist
+class _LonglistState(NamedTuple):
+    """everything a lookup needs, published as one reference so lookups never take a lock. nothing in it changes once published"""
+    words: frozenset[str]
+    base: AhoCorasick # compiled
+    added: AhoCorasick | None # compiled, words added since base was built
+    added_words: frozenset[str]
+    removed: frozenset[str] # words still in base that aren't in the list anymore
+
 class ProfanityLonglist(ProfanityFilter):
+    # pending edits before they're folded into a new base automaton
+    compact_after = 64
+
+    def __init__(self, words: Iterable[str] | None = None):
+        """
+        Args:
+            words (Iterable[str], optional): the bad words to look for. defaults to the decoded longlist from words.py (loaded on first use)
+        """
+        self._state: _LonglistState | None = None
+        self._edit_lock = threading.Lock()
+        if words is not None:
+            self.set_words(words)
+
+    @staticmethod
+    def _new_state(words: Iterable[str], base: AhoCorasick | None = None) -> _LonglistState:
+        words = frozenset(words)
+        if base is None:
+            base = AhoCorasick(words)
+            base.compile()
+        return _LonglistState(words, base, None, frozenset(), frozenset())
+
+    def set_words(self, words: Iterable[str]) -> None:
+        """replaces the word list and rebuilds the automaton (one pass over the words, so it's cheap)"""
+        state = self._new_state(w.strip().lower() for w in words if w.strip())
+        with self._edit_lock:
+            self._state = state
+            self.version += 1
+
+    def _load_default_words(self) -> _LonglistState:
+        with self._edit_lock:
+            if self._state is None:
+                data = derived_data()
+                self._state = self._new_state(data["longlist"], data["longlist_automaton"])
+            return self._state
+
+    @property
+    def state(self) -> _LonglistState:
+        state = self._state
+        return state if state is not None else self._load_default_words()
+
+    def _edit(self, words: Iterable[str], add: bool) -> list[str]:
+        words = [w.strip().lower() for w in words if w.strip()]
+        self.state # the defaults load under the same lock, so before taking it
+        with self._edit_lock:
+            state = cast(_LonglistState, self._state)
+            changed = [w for w in dict.fromkeys(words) if (w in state.words) != add]
+            if not changed:
+                return []
+
+            listed = state.words | set(changed) if add else state.words - set(changed)
+            added_words, removed = set(state.added_words), set(state.removed)
+            for word in changed:
+                if add:
+                    # a word taken out of base and put back just needs its tombstone gone
+                    if word in removed:
+                        removed.discard(word)
+                    else:
+                        added_words.add(word)
+                elif word in added_words:
+                    added_words.discard(word)
+                else:
+                    removed.add(word)
+
+            if len(added_words) + len(removed) > self.compact_after:
+                # fold everything into a fresh base now and then, so lookups don't pay for a long tail of edits
+                self._state = self._new_state(listed)
+            else:
+                # only the (small) automaton of added words is rebuilt, base stays as it is
+                added = None
+                if added_words:
+                    added = AhoCorasick(added_words)
+                    added.compile()
+                self._state = _LonglistState(frozenset(listed), state.base, added, frozenset(added_words), frozenset(removed))
+            self.version += 1
+            return changed
+
+    def add_words(self, words: Iterable[str]) -> list[str]:
+        """adds words to the list while chat keeps being checked, returns the ones that weren't in it yet"""
+        return self._edit(words, True)
+
+    def remove_words(self, words: Iterable[str]) -> list[str]:
+        """removes words from the list while chat keeps being checked, returns the ones that were in it"""
+        return self._edit(words, False)
+
+    @property
+    def words(self) -> list[str]:
+        return list(self.state.words)
+
+    @property
+    def automaton(self) -> AhoCorasick:
+        """the base automaton, words added at runtime are in state.added until the next compaction"""
+        return self.state.base
+
+    def warm_up(self) -> None:
+        """loads and compiles the automaton now instead of on the first message"""
+        self.automaton.compile()
+
+    def find_spans(self, text: str) -> list[tuple[int, int]]:
+        """
+        finds every longlist hit in a single pass over the tokenized text
+
+        hits never cross token boundaries, so spans are offsets into the joined, lowered tokens (what censor() rebuilds from)
+
+        Returns:
+            list[tuple[int, int]]: (start, end) span of every hit
+        """
+        tokens = self.normalize_tokens(scan_tokens(text))
+        return [span for _, span in self._token_hits(tokens)]
+
+    def _token_hits(self, tokens: list[Token]) -> Iterator[tuple[int, tuple[int, int]]]:
+        """yields (token index, span) for every hit, the automaton restarts at every token boundary"""
+        texts = [t.text for t in tokens]
+        joined = "".join(texts)
+        state = self.state
+        base, added, removed = state.base, state.added, state.removed
+        start = 0
+        for i, token in enumerate(texts):
+            end = start + len(token)
+            for span in base.iter_matches(joined, start, end):
+                if not removed or joined[span[0]:span[1]] not in removed:
+                    yield i, span
+            if added is not None:
+                for span in added.iter_matches(joined, start, end):
+                    yield i, span
+            start = end
+
+    def normalize_tokens(self, tokens: list[Token]) -> list[Token]:
+        # the longlist is matched against (and censors) lowered tokens, words already are
+        normalized = []
+        for t in tokens:
+            if t.kind != TOKEN_WORD:
+                lowered = t.text.lower()
+                if lowered != t.text:
+                    t = t.with_text(lowered)
+            normalized.append(t)
+        return normalized
+
+    def continue_scan(self, tokens: list[Token], node: int = 0, max_fragment: int = 4) -> tuple[bool, int]:
+        """
+        streaming check for words split over consecutive messages ("fu", then "ck"). words added at runtime
+        are only caught across messages once they're compacted into the base automaton
+
+        node is the automaton state the previous message ended in (0 for none), the first word of this message carries on
+        from it like the two were one word. only the first and last words get scanned, however long the history is
+
+        a last word that's a real word on its own ("was", "its", "god") never carries over, otherwise ordinary chat
+        like "i was" then "so cool" reads as a split word. that means "fu" then "ck" isn't caught either, "fuc" then "k" is
+
+        Returns:
+            tuple[bool, int]: whether a longlist word started in an earlier message and ended in this one, and the state to
+            carry over to the next message (0 unless this one ends in a non-dictionary word of at most max_fragment characters)
+        """
+        tokens = self.normalize_tokens(tokens)
+        if not tokens:
+            return (False, node)
+        state = self.state
+        automaton = state.base
+
+        split = False
+        if node and tokens[0].kind == TOKEN_WORD:
+            first = tokens[0].text
+            node, spans = automaton.advance(node, first)
+            # a removed word ends in this message's part of it, and is as long as the match
+            split = any(
+                start < 0 and not any(len(w) == end - start and w.endswith(first[:end]) for w in state.removed)
+                for start, end in spans
+            )
+        else:
+            node = 0
+
+        last = tokens[-1]
+        if last.kind != TOKEN_WORD or len(last.text) > max_fragment or last.text in derived_data()["english_words"]:
+            return (split, 0)
+        if len(tokens) > 1 or not node:
+            # a one-word message carrying on keeps the state it got to above
+            node, _ = automaton.advance(0, last.text)
+        return (split, node)
+
     def is_profane(self, text: str) -> bool:
         """
         checks for profanity in the extra longlist of profanities, returns true anything is found
 
         note that this is NOT a replacement for the other like the profanity-check ones, and this is an extra list because profanity-check doesn't see things like "shlt"
         """
-        tokens = split_into_tokens(text); tokens = [t.lower() for t in tokens] # split into words + separators, then lower
+        return self.is_profane_tokens(scan_tokens(text)) # split into words + separators
 
-        # check for bad words, return true if even just one is found
-        for token in tokens:
-            for bad in _longlist:
-                if bad in token:
-                    return True
+    def is_profane_tokens(self, tokens: list[Token]) -> bool:
+        # return true if even just one bad word is found
+        for _ in self._token_hits(self.normalize_tokens(tokens)):
+            return True
         return False
                 
     def censor(self, text: str, replacement: str = "#", neighbors: int = 1) -> str:
@@ -156,88 +559,277 @@ class ProfanityLonglist(ProfanityFilter):
         Returns:
             str: the censored text.
         """
-        def is_word_token(tok: str) -> bool:
-            # treat as a word if it contains at least one alphabetic character
-            return any(ch.isalpha() for ch in tok)
+        # tokenize + lowercase
+        tokens = self.normalize_tokens(scan_tokens(text))
+        mask = self.censor_mask(tokens, [False] * len(tokens), replacement, neighbors=neighbors)
+        return apply_censor_mask(tokens, mask, replacement)
 
-        # tokenize + lowercase in place
-        tokens = split_into_tokens(text); tokens = [t.lower() for t in tokens]
+    def censor_mask(self, tokens: list[Token], censored: list[bool], replacement: str = "#", neighbors: int = 1) -> list[bool]:
+        tokens = self.normalize_tokens(tokens)
         n = len(tokens)
-        censored = [False] * n
-
-        for i, token in enumerate(tokens):
-            if is_word_token(token):
-                for bad in _longlist:
-                    if bad in token:
-                        # way better checking but i don't wanna put this in is_profane_longlist
-
-                        # always censor the bad word itself
-                        censored[i] = True
-
-                        # extend left (neighbors - 1 words)
-                        j, words_seen = i, 0
-                        while j > 0 and words_seen < neighbors - 1:
-                            j -= 1
-                            if is_word_token(tokens[j]):
-                                censored[j] = True
-                                words_seen += 1
-
-                        # extend right (neighbors - 1 words)
-                        j, words_seen = i, 0
-                        while j < n - 1 and words_seen < neighbors - 1:
-                            j += 1
-                            if is_word_token(tokens[j]):
-                                censored[j] = True
-                                words_seen += 1
-                        break  # stop after first badword match
-
-        # rebuild text with censored replacements
-        result_tokens = []
-        for token, flag in zip(tokens, censored):
-            if flag and is_word_token(token):
-                result_tokens.append(replacement * len(token))
-            else:
-                result_tokens.append(token)
+        # treat as a word if it contains at least one alphabetic character (separators never do)
+        is_word = [t.kind == TOKEN_WORD and not c and any(ch.isalpha() for ch in t.text) for t, c in zip(tokens, censored)]
+        mask = [False] * n
+
+        # every token with at least one hit inside it, from the automaton's spans
+        hit_tokens = sorted({i for i, _ in self._token_hits(tokens)})
+
+        for i in hit_tokens:
+            if not is_word[i]:
+                continue
+
+            # always censor the bad word itself
+            mask[i] = True
 
-        return "".join(result_tokens)
+            # extend left (neighbors - 1 words)
+            j, words_seen = i, 0
+            while j > 0 and words_seen < neighbors - 1:
+                j -= 1
+                if is_word[j]:
+                    mask[j] = True
+                    words_seen += 1
+
+            # extend right (neighbors - 1 words)
+            j, words_seen = i, 0
+            while j < n - 1 and words_seen < neighbors - 1:
+                j += 1
+                if is_word[j]:
+                    mask[j] = True
+                    words_seen += 1
+
+        return mask
 
 
 # profanity-check
+class _PendingPrediction:
+    __slots__ = ("texts", "result", "error", "done", "lead")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.result: Sequence[Any] | None = None
+        self.error: Exception | None = None
+        self.done = threading.Event()
+        self.lead = False # set when this caller has to run the next batch
+
+class PredictionBatcher:
+    """
+    micro-batches model calls from many threads into one vectorized call
+
+    the first caller to show up runs the batch (the "leader"), anyone arriving while a batch is running queues up and gets scored
+    together in the next one, and every caller gets back just its own slice.
+    a lone caller is scored straight away. the leader only lingers (up to max_wait seconds) when other callers are already queued,
+    so a quiet server doesn't pay any extra latency.
+    """
+    def __init__(self, predict_fn: Callable[[list[str]], Sequence[Any]], max_batch_size: int = 256, max_wait: float = 0.002):
+        """
+        Args:
+            predict_fn (Callable): the vectorized model call, like profanity_check.predict or predict_prob
+            max_batch_size (int, optional): max texts per model call, a single caller's texts are never split up. defaults to 256
+            max_wait (float, optional): how long a leader lingers for a fuller batch when there's contention, in seconds. defaults to 0.002
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._queue: list[_PendingPrediction] = []
+        self._queued_texts = 0
+        self._busy = False
+
+        # stats
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+    def predict(self, texts: Sequence[str]) -> Sequence[Any]:
+        """scores texts, blocking until the batch they end up in is done"""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        pending = _PendingPrediction(texts)
+        with self._cond:
+            self._queue.append(pending)
+            self._queued_texts += len(texts)
+            if self._busy:
+                self._cond.notify()
+            else:
+                self._busy = True
+                pending.lead = True
+
+        if not pending.lead:
+            pending.done.wait()
+        if pending.lead: # either the first one here, or handed the next batch by the previous leader
+            self._lead()
+
+        if pending.error is not None:
+            raise pending.error
+        return cast(Sequence[Any], pending.result)
+
+    def _lead(self) -> None:
+        with self._cond:
+            # only linger if there's already contention
+            if self.max_wait > 0 and len(self._queue) > 1:
+                deadline = time.monotonic() + self.max_wait
+                while self._queued_texts < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            # take from the front, always at least one caller
+            batch: list[_PendingPrediction] = []
+            size = 0
+            while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch_size):
+                pending = self._queue.pop(0)
+                batch.append(pending)
+                size += len(pending.texts)
+            self._queued_texts -= size
+
+        try:
+            self._run_batch(batch)
+        finally:
+            # KeyboardInterrupt and the like go up the leader's stack, the rest of the batch still gets let go
+            for pending in batch:
+                if pending.result is None and pending.error is None:
+                    pending.error = RuntimeError("the prediction batch was interrupted")
+
+            with self._cond:
+                self.batches += 1
+                self.requests += len(batch)
+                self.texts += size
+
+                # hand the next batch to whoever is first in line
+                if self._queue:
+                    self._queue[0].lead = True
+                    self._queue[0].done.set()
+                else:
+                    self._busy = False
+
+            for pending in batch:
+                pending.done.set()
+
+    def _run_batch(self, batch: list[_PendingPrediction]) -> None:
+        try:
+            flat = [text for pending in batch for text in pending.texts]
+            results = self.predict_fn(flat)
+            offset = 0
+            for pending in batch:
+                pending.result = results[offset:offset + len(pending.texts)]
+                offset += len(pending.texts)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].error = e
+                return
+
+        # one caller's texts (or a hiccup) shouldn't fail everyone that happened to be batched with it,
+        # so each one gets scored on its own and only the ones that still fail raise
+        for pending in batch:
+            pending.result = None
+            try:
+                pending.result = self.predict_fn(pending.texts)
+            except Exception as e:
+                pending.error = e
+
+    def stats(self) -> dict[str, float]:
+        """batching counters, texts_per_batch is how much batching is actually happening"""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "texts_per_batch": self.texts / self.batches if self.batches else 0.0,
+        }
+
+# the model's vectorizer only sees runs of 2+ word characters, a window without one scores the same as an empty window
+_SCORABLE = re.compile(r"\w\w")
+
 class ProfanityCheck(ProfanityFilter):
+    def __init__(self, max_batch_size: int = 256, max_wait: float = 0.002, window_cache_size: int = 4096):
+        """
+        Args:
+            max_batch_size (int, optional): max texts per model call when batching messages together. defaults to 256
+            max_wait (float, optional): max seconds a batch waits to fill up when messages are being checked at the same time. defaults to 0.002
+            window_cache_size (int, optional): how many censor windows to remember the prediction of. defaults to 4096
+        """
+        self.batcher = PredictionBatcher(_predict, max_batch_size=max_batch_size, max_wait=max_wait)
+        self.window_cache: LRUCache[str, int] = LRUCache(window_cache_size)
+
+    def set_model(self, predict_fn: Callable[[list[str]], Sequence[Any]]) -> None:
+        """swaps the model for another vectorized predict function (texts -> 0/1 per text)"""
+        self.batcher.predict_fn = predict_fn
+        self.window_cache.clear()
+        self.version += 1
+
+    def warm_up(self) -> None:
+        """loads the model and scores an empty window, so the first message doesn't pay for it"""
+        if self.batcher.predict_fn is _predict and _model_predict is None:
+            self._predict_windows([""])
+
+    def _predict_windows(self, windows: list[str]) -> list[int]:
+        """predictions for censor windows, only windows that aren't cached go to the model (once each)"""
+        predictions = [0] * len(windows)
+        missing: dict[str, list[int]] = {}
+
+        for i, window in enumerate(windows):
+            key = window if _SCORABLE.search(window) else "" # separators and such all share the empty window's prediction
+            flag = self.window_cache.get(key)
+            if flag is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                predictions[i] = flag
+
+        if missing:
+            keys = list(missing)
+            for key, flag in zip(keys, self.batcher.predict(keys)):
+                flag = int(flag)
+                self.window_cache.put(key, flag)
+                for i in missing[key]:
+                    predictions[i] = flag
+
+        return predictions
+
     def is_profane(self, text: str) -> bool:
         """
         check if the given text contains profanity
         """
-        tokens = split_into_tokens(text)
-        normalized_text = "".join(tokens)  # join tokens back into a single string
-        return bool(predict([normalized_text])[0])
+        return self.is_profane_tokens(scan_tokens(text))
+
+    def is_profane_tokens(self, tokens: list[Token]) -> bool:
+        normalized_text = "".join(t.text for t in tokens)  # join tokens back into a single string
+        return bool(self.batcher.predict([normalized_text])[0])
 
     def censor(self, text: str, replacement: str = "#", neighbors: int = 1, window_size: int = 1) -> str:
         """
         Censors profane words using a sliding window.
-        Works directly on tokens from split_into_tokens.
+        Works directly on tokens from scan_tokens.
         """
-        raw_tokens = split_into_tokens(text)             # includes words + separators
-        lowered_tokens = [t.lower() for t in raw_tokens] # normalized for detection
+        raw_tokens = scan_tokens(text)             # includes words + separators
+        mask = self.censor_mask(raw_tokens, [False] * len(raw_tokens), replacement, neighbors=neighbors, window_size=window_size)
+        return apply_censor_mask(raw_tokens, mask, replacement)
+
+    def censor_mask(self, tokens: list[Token], censored: list[bool], replacement: str = "#", neighbors: int = 1, window_size: int = 1) -> list[bool]:
+        # already censored tokens are seen as the #'s they turned into, words are already lowered
+        lowered_tokens = [
+            (replacement * len(t.text)).lower() if c else t.text if t.kind == TOKEN_WORD else t.text.lower()
+            for t, c in zip(tokens, censored)
+        ] # normalized for detection
         n = len(lowered_tokens)
+        if n == 0:
+            return []
 
         # build sliding windows
         windows = [" ".join(lowered_tokens[i:i+window_size]) for i in range(n)]
-        predictions = predict(windows)
+        predictions = self._predict_windows(windows)
 
-        censored = [False] * n
+        flagged = [False] * n
 
         for i, flag in enumerate(predictions):
             if flag == 1:
                 start = max(0, i - neighbors)
                 end = min(n, i + window_size + neighbors)
                 for j in range(start, end):
-                    censored[j] = True
+                    flagged[j] = True
 
         # censor words only, keep separators intact
-        censored_tokens = [
-            (replacement * len(tok)) if censored[i] and tok.strip() and not tok.isspace() else tok
-            for i, tok in enumerate(raw_tokens)
-        ]
-
-        return "".join(censored_tokens)
+        return [flagged[i] and not c and bool(tok.text.strip()) for i, (tok, c) in enumerate(zip(tokens, censored))]